@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluator import flake8_engine  # noqa: E402
+
+# Compares the per-file subprocess engine against the in-process engines
+# on one corpus folder and checks that all of them render the same report text.
+parser = argparse.ArgumentParser(description="Benchmark flake8 engines")
+parser.add_argument("folder", nargs="?", default="black")
+parser.add_argument("--repeat", type=int, default=3)
+args = parser.parse_args()
+
+folder = os.path.abspath(args.folder)
+filenames = [filename for filename in os.listdir(folder) if filename.endswith(".py")]
+paths = [os.path.join(folder, filename) for filename in filenames]
+
+
+def render(violations):
+    return "".join(
+        f"File: {filename}\n"
+        + (flake8_engine.format_violations(violations[path]) or "No violations found.")
+        + "\n\n"
+        for filename, path in zip(filenames, paths)
+    )
+
+
+timings = {}
+outputs = {}
+for engine in flake8_engine.ENGINES:
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        violations = flake8_engine.run(engine, paths)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    timings[engine] = best
+    outputs[engine] = render(violations)
+
+print(f"Folder: {folder} ({len(filenames)} files, best of {args.repeat})")
+for engine, elapsed in timings.items():
+    print(f"{engine:>10}: {elapsed:.3f}s ({len(filenames) / elapsed:.1f} files/s)")
+print(f"Speedup: {timings['subprocess'] / timings['inprocess']:.1f}x")
+
+if any(output != outputs["inprocess"] for output in outputs.values()):
+    print("❌ Engines produced different report output")
+    sys.exit(1)
+print("✅ Report output is byte-identical")
@@ -0,0 +1,133 @@
+import argparse
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tokenize
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_corpus  # noqa: E402
+from evaluator import mapped  # noqa: E402
+from evaluator.cache import ResultCache  # noqa: E402
+from evaluator.evaluate import ENGINES, iter_files  # noqa: E402
+
+# Compares the copying reads the pipeline used to do (the cache digest, the
+# line count and the in-process engine each opened the file and read their
+# own copy) with the single read into a mapped.Source whose buffer serves
+# all three, on a synthetic corpus; both readers must give the same results.
+# Then the pipeline itself (evaluate.iter_files, as evaluate() runs it with
+# --compare) goes over the first --pipeline files twice with a fresh result
+# cache: cold, where the engine analyzes every file, and warm, where every
+# result is a cache hit and what is left is reading, hashing, counting and
+# lookups. Opens of sample files in this process are counted with an audit
+# hook, and both passes must produce the same results.
+parser = argparse.ArgumentParser(description="Benchmark how the evaluation pipeline reads the corpus")
+parser.add_argument("--files", type=int, default=100000)
+parser.add_argument("--corpus", help="existing corpus dir to read instead of generating one")
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--pipeline", type=int, default=1000,
+                    help="files to run through the pipeline (default: 1000; the cold pass analyzes each one)")
+parser.add_argument("--engine", choices=ENGINES, default="shared")
+parser.add_argument("--radon-metrics", action="store_true", help="also compute radon raw/MI/Halstead")
+parser.add_argument("--mmap-threshold", type=int, default=mapped.MMAP_THRESHOLD,
+                    help=f"map files of at least this many bytes (default: {mapped.MMAP_THRESHOLD}; 0 maps every "
+                         "non-empty file)")
+args = parser.parse_args()
+
+
+def copying(file_path):
+    with open(file_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    with open(file_path, "rb") as f:
+        lines = sum(1 for _ in f)
+    with open(file_path, "rb") as f:
+        data = f.read()
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        text = data.decode(encoding)
+    except (SyntaxError, UnicodeError):
+        text = data.decode("latin-1")
+    return digest, lines, len(text)
+
+
+def shared(file_path):
+    source = mapped.open_source(file_path)
+    result = source.digest, source.line_count, len(mapped.decode(source.buffer))
+    source.release()
+    return result
+
+
+def compare_readers(paths):
+    print(f"{'reader':>6}  {'seconds':>8}  {'files/s':>8}")
+    timings = {}
+    results = {}
+    for name, reader in (("copy", copying), ("shared", shared)):
+        start = time.perf_counter()
+        results[name] = [reader(file_path) for file_path in paths]
+        timings[name] = time.perf_counter() - start
+        print(f"{name:>6}  {timings[name]:>8.2f}  {len(paths) / timings[name]:>8.0f}")
+    if results["copy"] != results["shared"]:
+        sys.exit("Readers disagree")
+    print(f"Results identical, shared: {100 * (timings['copy'] / timings['shared'] - 1):+.0f}% files/s")
+
+
+opens = Counter()
+watched = []
+
+
+def count_opens(event, hook_args):
+    if event == "open" and isinstance(hook_args[0], str) and watched and hook_args[0].startswith(watched[0]):
+        opens[hook_args[0]] += 1
+
+
+def run(name, paths, cache):
+    opens.clear()
+    start = time.perf_counter()
+    stream = iter_files(paths, args.engine, cache=cache, radon_metrics=args.radon_metrics, line_counts=True)
+    results = [result[1:] for result in stream]
+    seconds = time.perf_counter() - start
+    print(f"{name:>6}  {seconds:>8.2f}  {len(paths) / seconds:>8.0f}  {sum(opens.values()) / len(paths):>14.2f}")
+    return results
+
+
+def main(corpus_dir):
+    mapped.MMAP_THRESHOLD = args.mmap_threshold
+    paths = sorted(
+        os.path.join(root, filename)
+        for root, _, filenames in os.walk(corpus_dir)
+        for filename in filenames if filename.endswith(".py")
+    )
+    sizes = [os.path.getsize(file_path) for file_path in paths]
+    print(f"{len(paths)} files, {sum(1 for size in sizes if size and size >= args.mmap_threshold)} memory-mapped")
+    # One untimed pass so both readers see a warm page cache
+    for file_path in paths:
+        with open(file_path, "rb") as f:
+            f.read()
+    compare_readers(paths)
+
+    paths = paths[:args.pipeline]
+    if not paths:
+        return
+    print(f"\nPipeline: {len(paths)} files, engine {args.engine}")
+    watched.append(os.path.abspath(corpus_dir))
+    sys.addaudithook(count_opens)
+    print(f"{'pass':>6}  {'seconds':>8}  {'files/s':>8}  {'opens per file':>14}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResultCache(cache_dir)
+        cold = run("cold", paths, cache)
+        warm = run("warm", paths, cache)
+    if cold != warm:
+        sys.exit("Cold and warm results disagree")
+    print("Results identical")
+
+
+if args.corpus:
+    main(args.corpus)
+else:
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_corpus(tmp, args.files, seed=args.seed)
+        main(tmp)
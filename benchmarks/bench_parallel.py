@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import grow_corpus  # noqa: E402
+from evaluator import flake8_engine  # noqa: E402
+
+# Scaling benchmark for the parallel flake8 engine over 1..N workers on a
+# synthetically grown corpus. Every run must match the serial result.
+parser = argparse.ArgumentParser(description="Benchmark the parallel flake8 engine")
+parser.add_argument("--source", default="original", help="corpus folder to replicate")
+parser.add_argument("--files", type=int, default=2000, help="size of the synthetic corpus")
+parser.add_argument("--max-jobs", type=int, default=flake8_engine.default_jobs())
+args = parser.parse_args()
+
+with tempfile.TemporaryDirectory() as tmp:
+    folder = grow_corpus(args.source, os.path.join(tmp, "corpus"), args.files)
+    paths = [os.path.join(folder, filename) for filename in sorted(os.listdir(folder))]
+
+    print(f"Corpus: {len(paths)} files grown from {args.source}/")
+    print(f"{'jobs':>4}  {'seconds':>8}  {'files/s':>8}  {'speedup':>7}")
+
+    baseline = None
+    expected = None
+    for jobs in range(1, args.max_jobs + 1):
+        start = time.perf_counter()
+        violations = flake8_engine.run_parallel(paths, jobs)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline, expected = elapsed, violations
+        elif violations != expected or list(violations) != list(expected):
+            print(f"❌ {jobs} workers produced different results than 1 worker")
+            sys.exit(1)
+        print(f"{jobs:>4}  {elapsed:>8.2f}  {len(paths) / elapsed:>8.1f}  {baseline / elapsed:>6.2f}x")
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate_corpus  # noqa: E402
+from evaluator import timing  # noqa: E402
+from evaluator.evaluate import ENGINES, evaluate  # noqa: E402
+
+RESULTS_FILE = os.path.join(ROOT, "benchmarks", "results", "scale.jsonl")
+
+# Scale benchmark: synthesizes corpora of 1k/10k/100k files from the real
+# triplets and measures end-to-end throughput, peak RSS and per-stage
+# latency. Every size runs in a fresh interpreter so peak RSS is its own.
+# Results are appended to benchmarks/results/scale.jsonl and each run is
+# compared with the previous one for the same size and engine.
+#
+# Stage columns are the profiler's own-time totals from that one run, so
+# they show the engine being measured: flake8 and radon for every engine
+# but async (subprocesses), with the in-process engines' decoding and
+# parsing under analysis ("-" where a stage did not run).
+STAGE_COLUMNS = ("list", "flake8", "radon", "analysis", "subprocesses", "write")
+parser = argparse.ArgumentParser(description="Scale benchmark of the evaluation pipeline")
+parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated corpus sizes in files")
+parser.add_argument("--engine", choices=ENGINES, default="inprocess")
+parser.add_argument("--jobs", type=int, default=None)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--results", default=RESULTS_FILE)
+parser.add_argument("--run-one", metavar="CORPUS_DIR", help=argparse.SUPPRESS)
+args = parser.parse_args()
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / scale
+
+
+# Runs inside the child interpreter: the full streaming pipeline end to end
+# with the profiler on (evaluate() turns it off when it returns), printed as
+# one JSON object. Peak RSS is read right after the run.
+def run_one(corpus_dir):
+    folders = [os.path.join(corpus_dir, folder) for folder in ("original", "black", "chatgpt")]
+    files = sum(1 for folder in folders for name in os.listdir(folder) if name.endswith(".py"))
+    with tempfile.TemporaryDirectory() as out:
+        profiler = timing.enable()
+        start = time.perf_counter()
+        evaluate(folders, engine=args.engine, jobs=args.jobs, output_dir=out, jsonl=True)
+        end_to_end = time.perf_counter() - start
+    peak_rss = peak_rss_mb()
+
+    print(json.dumps({
+        "files": files,
+        "seconds": end_to_end,
+        "files_per_sec": files / end_to_end,
+        "peak_rss_mb": peak_rss,
+        "stages": {name: wall for name, (wall, _, _) in profiler.stages.items()},
+    }))
+
+
+def stage_cell(stages, name):
+    return f"{stages[name]:.2f}" if name in stages else "-"
+
+
+def previous_runs(results_file):
+    runs = {}
+    if os.path.exists(results_file):
+        with open(results_file, encoding="utf-8") as f:
+            for line in f:
+                run = json.loads(line)
+                runs[(run["files"], run["engine"])] = run
+    return runs
+
+
+def main():
+    git_rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT)
+    previous = previous_runs(args.results)
+    os.makedirs(os.path.dirname(args.results), exist_ok=True)
+
+    print(f"{'files':>7}  {'seconds':>8}  {'files/s':>8}  {'rss MB':>7}  "
+          + "".join(f"{name:>{max(8, len(name))}}  " for name in STAGE_COLUMNS) + "vs last")
+    for size in (int(size) for size in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            generate_corpus(tmp, size, seed=args.seed)
+            generate_seconds = time.perf_counter() - start
+
+            # A quiet child interpreter, so evaluate()'s prints stay out of the table
+            command = [sys.executable, os.path.abspath(__file__), "--run-one", tmp, "--engine", args.engine]
+            if args.jobs:
+                command += ["--jobs", str(args.jobs)]
+            child = subprocess.run(command, capture_output=True, text=True, cwd=tmp)
+            if child.returncode != 0:
+                sys.exit(child.stderr)
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+
+        result.update({
+            "engine": args.engine,
+            "jobs": args.jobs,
+            "generate_seconds": generate_seconds,
+            "git_rev": git_rev.stdout.strip(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        with open(args.results, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+
+        last = previous.get((result["files"], args.engine))
+        change = f"{100 * (result['files_per_sec'] / last['files_per_sec'] - 1):+.0f}%" if last else "-"
+        stages = result["stages"]
+        columns = "".join(f"{stage_cell(stages, name):>{max(8, len(name))}}  " for name in STAGE_COLUMNS)
+        print(f"{result['files']:>7}  {result['seconds']:>8.2f}  {result['files_per_sec']:>8.1f}  "
+              f"{result['peak_rss_mb']:>7.0f}  {columns}{change}")
+
+
+if args.run_one:
+    run_one(args.run_one)
+else:
+    main()
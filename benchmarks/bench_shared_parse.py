@@ -0,0 +1,83 @@
+import argparse
+import ast
+import os
+import sys
+import time
+import tokenize
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluator import analysis, flake8_engine, radon_engine  # noqa: E402
+
+# Measures how much tokenize/parse work flake8 + radon do per file when run
+# separately versus through the shared single-parse engine. ast.parse and
+# tokenize.generate_tokens are wrapped with timers for the duration of the run.
+parser = argparse.ArgumentParser(description="Benchmark the shared-AST analysis pass")
+parser.add_argument("files", nargs="*", default=[
+    os.path.join(folder, f"{prefix}{name}.py")
+    for folder, prefix in (("original", ""), ("black", ""), ("chatgpt", "c"))
+    for name in ("ex22", "ex23")
+])
+parser.add_argument("--repeat", type=int, default=5)
+args = parser.parse_args()
+
+stats = {"parse": [0, 0.0], "tokenize": [0, 0.0]}
+real_parse = ast.parse
+real_generate_tokens = tokenize.generate_tokens
+
+
+def timed_parse(*a, **kw):
+    start = time.perf_counter()
+    try:
+        return real_parse(*a, **kw)
+    finally:
+        stats["parse"][0] += 1
+        stats["parse"][1] += time.perf_counter() - start
+
+
+def timed_generate_tokens(*a, **kw):
+    stats["tokenize"][0] += 1
+    start = time.perf_counter()
+    for token in real_generate_tokens(*a, **kw):
+        stats["tokenize"][1] += time.perf_counter() - start
+        yield token
+        start = time.perf_counter()
+    stats["tokenize"][1] += time.perf_counter() - start
+
+
+def separate(paths, linter):
+    for file_path in paths:
+        linter.lint(file_path)
+        with open(file_path, encoding="utf-8") as f:
+            radon_engine.analyze_source(os.path.basename(file_path), f.read())
+
+
+def shared(paths, linter):
+    for file_path in paths:
+        parsed = analysis.parse_file(file_path)
+        linter.lint_checker(analysis._shared_checker(linter, parsed))
+        analysis._radon(parsed)
+
+
+paths = [os.path.abspath(path) for path in args.files]
+linter = flake8_engine.Linter()
+ast.parse = timed_parse
+tokenize.generate_tokens = timed_generate_tokens
+
+print(f"{len(paths)} files x {args.repeat} runs")
+print(f"{'mode':>8}  {'parses':>6}  {'parse s':>8}  {'tokenizes':>9}  {'tokenize s':>10}  {'total s':>8}")
+results = {}
+for name, run in (("separate", separate), ("shared", shared)):
+    for stat in stats.values():
+        stat[:] = [0, 0.0]
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        run(paths, linter)
+    total = time.perf_counter() - start
+    results[name] = (stats["parse"][1] + stats["tokenize"][1], total)
+    print(f"{name:>8}  {stats['parse'][0]:>6}  {stats['parse'][1]:>8.3f}  "
+          f"{stats['tokenize'][0]:>9}  {stats['tokenize'][1]:>10.3f}  {total:>8.3f}")
+
+(separate_parse, separate_total), (shared_parse, shared_total) = results["separate"], results["shared"]
+print(f"Parse + tokenize time: -{100 * (1 - shared_parse / separate_parse):.0f}%, "
+      f"end to end: -{100 * (1 - shared_total / separate_total):.0f}%")
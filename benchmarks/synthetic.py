@@ -0,0 +1,80 @@
+import os
+import random
+import re
+import shutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Folder -> filename prefix of the dataset's three variants
+VARIANTS = {"original": "ex", "black": "ex", "chatgpt": "cex"}
+
+# Sample ids of copies are copy * ID_STRIDE + original id, so copy 3 of ex7
+# is ex307 in every variant and the triplets still join by sample id
+ID_STRIDE = 100
+
+_SAMPLE_RE = re.compile(r"^c?ex(\d+)\.py$")
+
+
+# Copy the samples of a corpus folder into dest until it holds `count` files.
+# Copies are named <stem>_<n>.py so every file stays a distinct sample.
+def grow_corpus(source, dest, count):
+    source = os.path.join(ROOT, source) if not os.path.isabs(source) else source
+    samples = sorted(filename for filename in os.listdir(source) if filename.endswith(".py"))
+    os.makedirs(dest, exist_ok=True)
+    for n in range(count):
+        filename = samples[n % len(samples)]
+        stem = filename[:-len(".py")]
+        shutil.copyfile(os.path.join(source, filename), os.path.join(dest, f"{stem}_{n // len(samples)}.py"))
+    return dest
+
+
+def _load_samples():
+    samples = {}
+    for folder in VARIANTS:
+        for filename in os.listdir(os.path.join(ROOT, folder)):
+            match = _SAMPLE_RE.match(filename)
+            if match:
+                with open(os.path.join(ROOT, folder, filename), encoding="utf-8") as f:
+                    samples.setdefault(int(match.group(1)), {})[folder] = f.read()
+    # Only complete triplets, so every generated sample exists in all variants
+    return {sample: texts for sample, texts in sorted(samples.items()) if len(texts) == len(VARIANTS)}
+
+
+# Small edits that keep the file valid Python but change its content hash
+# (and some of its lint results): a header comment naming the copy, blank
+# lines and trailing whitespace at random spots outside line continuations
+def mutate(text, copy, rng):
+    lines = text.splitlines(keepends=True)
+    safe = [i for i, line in enumerate(lines) if not line.rstrip("\r\n").endswith("\\")]
+    for _ in range(rng.randint(0, 3)):
+        if not safe:
+            break
+        i = rng.choice(safe)
+        if rng.random() < 0.5:
+            lines[i] = lines[i].rstrip("\r\n") + " " * rng.randint(1, 3) + "\n"
+        else:
+            lines.insert(i + 1, "\n")
+            safe = [j + 1 if j > i else j for j in safe]
+    return f"# synthetic copy {copy}\n" + "".join(lines)
+
+
+# Writes original/, black/ and chatgpt/ under dest with `files` files in
+# total, replicating and mutating the real triplets. Deterministic for a
+# given seed. Returns the variant folders.
+def generate_corpus(dest, files, seed=0):
+    rng = random.Random(seed)
+    samples = _load_samples()
+    ids = list(samples)
+    folders = {folder: os.path.join(dest, folder) for folder in VARIANTS}
+    for folder in folders.values():
+        os.makedirs(folder, exist_ok=True)
+
+    for n in range(files // len(VARIANTS)):
+        copy, sample = divmod(n, len(ids))
+        texts = samples[ids[sample]]
+        sample_id = copy * ID_STRIDE + ids[sample]
+        for folder, prefix in VARIANTS.items():
+            text = texts[folder] if copy == 0 else mutate(texts[folder], copy, rng)
+            with open(os.path.join(folders[folder], f"{prefix}{sample_id}.py"), "w", encoding="utf-8") as f:
+                f.write(text)
+    return [folders[folder] for folder in VARIANTS]
@@ -0,0 +1,105 @@
+import argparse
+
+from evaluator.archive import is_archive
+from evaluator.block_index import DEFAULT_INDEX_FILE
+from evaluator.cache import DEFAULT_CACHE_DIR
+from evaluator.client import DEFAULT_SOCKET
+from evaluator.corpus import DEFAULT_FOLDERS
+from evaluator.evaluate import ENGINES, evaluate
+from evaluator.flake8_engine import DEFAULT_CHUNK_SIZE
+from evaluator.orchestrator import TOOLS, parse_timeouts
+from evaluator.watch import DEFAULT_INTERVAL, watch
+
+DESCRIPTION = "Flake8 and Radon evaluation of one or more corpus folders"
+
+
+# The command line of python -m evaluator. With `folders` fixed (the
+# FandR*.py wrappers) it takes no folders of its own and keeps the script's
+# name as prog.
+def make_parser(folders=None, description=DESCRIPTION):
+    parser = argparse.ArgumentParser(prog=None if folders else "python -m evaluator", description=description)
+    if not folders:
+        parser.add_argument("folders", nargs="*", default=list(DEFAULT_FOLDERS),
+                            help="corpus folders, or one corpus archive, to evaluate "
+                                 "(default: original black chatgpt)")
+    parser.add_argument("--engine", choices=ENGINES, default="inprocess",
+                        help="inprocess: one flake8 in this interpreter; parallel: a process pool; "
+                             "batch/subprocess: one flake8 process per chunk/per file; "
+                             "shared: one parse per file for flake8 and radon; async: concurrent subprocesses")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"files per flake8 process for --engine batch and async (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="worker processes for --engine parallel, or concurrent subprocesses for --engine async "
+                             "and --extra-tools (default: CPU count)")
+    parser.add_argument("--timeout", action="append", metavar="TOOL=SECONDS", default=[],
+                        help="per-tool subprocess timeout for --engine async and --extra-tools (repeatable)")
+    parser.add_argument("--extra-tools", default="",
+                        help=f"comma-separated subprocess tools to run alongside, writing <folder>_<tool>.txt "
+                             f"({', '.join(name for name in TOOLS if name not in ('flake8', 'radon'))})")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"result cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="re-run every tool on every file")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="also write <folder>_evaluation.jsonl with one record per violation and radon block")
+    parser.add_argument("--compare", action="store_true",
+                        help="also join the variants by sample id and write comparison.csv with per-sample deltas")
+    parser.add_argument("--metrics", metavar="FILE", default=None,
+                        help="also write the samples x variants x features metrics matrix (.npz, or .parquet with "
+                             "pandas)")
+    parser.add_argument("--since", metavar="REV", default=None,
+                        help="only re-evaluate files git reports as changed since REV and merge them into the "
+                             "existing JSONL records (implies --jsonl)")
+    parser.add_argument("--server", action="store_true",
+                        help="get results from a running python -m evaluator.server instead of analyzing here")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET,
+                        help=f"evaluation server socket for --server (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every stage (wall and CPU) and file, and append a profile to each report")
+    parser.add_argument("--trace", metavar="FILE", default=None,
+                        help="also write the stage timings as Chrome trace JSON (chrome://tracing, Perfetto)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and re-evaluate files as they change, rewriting the affected reports")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"seconds between checks for changed files with --watch (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--format", action="store_true",
+                        help="first regenerate black/ from original/ with Black in-process (cached, over --jobs "
+                             "processes) and write per-sample formatting latency to formatting.csv")
+    parser.add_argument("--equivalence", action="store_true",
+                        help="also check every variant's AST against original/ and write equivalence.csv with the "
+                             "differing nodes per sample")
+    parser.add_argument("--keep-docstrings", action="store_true",
+                        help="count docstring changes as differences in --equivalence (ignored by default)")
+    parser.add_argument("--block-index", metavar="FILE", nargs="?", const=DEFAULT_INDEX_FILE, default=None,
+                        help=f"also store every radon block's CC, LOC and violations in a persistent index keyed by "
+                             f"(sample, variant, name); query it with python -m evaluator.block_index "
+                             f"(default file: {DEFAULT_INDEX_FILE})")
+    parser.add_argument("--radon-metrics", action="store_true",
+                        help="also add radon raw (LOC/SLOC/comments), maintainability index and Halstead metrics per "
+                             "file to the JSONL records, from one in-process parse per file (implies --jsonl)")
+    parser.add_argument("--output-dir", default=None,
+                        help="where <folder>_evaluation.txt reports are written (default: current directory)")
+    return parser
+
+
+def main(folders=None, description=DESCRIPTION):
+    parser = make_parser(folders, description)
+    args = parser.parse_args()
+    folders = folders or args.folders
+    if args.watch and any(is_archive(folder) for folder in folders):
+        parser.error("--watch needs corpus folders; unpack the archive with python -m evaluator.archive unpack")
+    if args.watch:
+        watch(folders, engine=args.engine, interval=args.interval, output_dir=args.output_dir,
+              cache_dir=None if args.no_cache else args.cache_dir, jsonl=args.jsonl)
+    else:
+        evaluate(folders, engine=args.engine, jobs=args.jobs, chunk_size=args.chunk_size,
+                 cache_dir=None if args.no_cache else args.cache_dir, jsonl=args.jsonl, compare=args.compare,
+                 metrics_file=args.metrics, since=args.since,
+                 extra_tools=[tool for tool in args.extra_tools.split(",") if tool],
+                 timeouts=parse_timeouts(args.timeout), profile=args.profile, trace_file=args.trace,
+                 server=args.socket if args.server else None, format_black=args.format,
+                 equivalence=args.equivalence, ignore_docstrings=not args.keep_docstrings,
+                 block_index_file=args.block_index, radon_metrics=args.radon_metrics, output_dir=args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import ast
+import io
+import os
+import tokenize
+from collections import namedtuple
+
+from evaluator import mapped, radon_engine, timing
+from evaluator.flake8_engine import Linter
+
+# One file read, tokenized and parsed once. tokens/tree are None when the
+# source does not tokenize/parse; flake8 then reports E902/E999 itself and
+# radon gets the parse error message.
+ParsedFile = namedtuple("ParsedFile", "path lines tokens tree error")
+
+
+def read_lines(file_path):
+    with mapped.open_mapped(file_path) as buffer:
+        return buffer_lines(buffer)
+
+
+def buffer_lines(buffer):
+    # Decoded straight from the buffer, with flake8's FileProcessor fallback,
+    # and split like the text file flake8 reads: universal newlines, so \r
+    # and \r\n end a line but form feeds and U+2028 do not
+    lines = io.StringIO(mapped.decode(buffer), newline=None).readlines()
+    # flake8 strips a leading BOM before tokenizing; do it once for everyone
+    if lines and lines[0].startswith("﻿"):
+        lines[0] = lines[0][1:]
+    return lines
+
+
+def parse_file(file_path):
+    return parse_lines(file_path, read_lines(file_path))
+
+
+def parse_lines(file_path, lines):
+    try:
+        line_iter = iter(lines)
+        tokens = list(tokenize.generate_tokens(lambda: next(line_iter)))
+    except (SyntaxError, tokenize.TokenError):
+        tokens = None
+    try:
+        return ParsedFile(file_path, lines, tokens, ast.parse("".join(lines)), None)
+    except (SyntaxError, ValueError) as e:
+        return ParsedFile(file_path, lines, tokens, None, str(e))
+
+
+def _shared_checker(linter, parsed):
+    from flake8.checker import FileChecker
+    from flake8.processor import FileProcessor
+
+    class SharedProcessor(FileProcessor):
+        def __init__(self, filename, options):
+            super().__init__(filename, options, lines=list(parsed.lines))
+            if parsed.tokens is not None:
+                # flake8 would otherwise tokenize again for its noqa map
+                self.file_tokens = parsed.tokens
+
+        def build_ast(self):
+            if parsed.tree is None:
+                return super().build_ast()
+            return parsed.tree
+
+        # Replays the shared tokens, pulling lines through next_line() just
+        # as the tokenizer would so line_number and indent_char stay in step
+        def generate_tokens(self):
+            if parsed.tokens is None:
+                yield from super().generate_tokens()
+                return
+            for token in parsed.tokens:
+                while self.line_number < min(token.end[0], self.total_lines):
+                    self.next_line()
+                if token.start[0] > self.total_lines:
+                    break
+                self.tokens.append(token)
+                yield token
+
+    class SharedFileChecker(FileChecker):
+        def _make_processor(self):
+            return SharedProcessor(self.filename, self.options)
+
+    app = linter.app
+    return SharedFileChecker(filename=parsed.path, plugins=app.plugins.checkers, options=app.options)
+
+
+# radon's results for a parsed file: (blocks,), or with `metrics`
+# (blocks, [FileMetrics]) in the list shape of the other tools, the MI
+# reusing the cc visitor's total complexity. A result that could not be
+# computed is its error message.
+def _radon(parsed, metrics=False):
+    from radon.visitors import ComplexityVisitor
+
+    if parsed.tree is None:
+        return (parsed.error,) * (1 + metrics)
+    filename = os.path.basename(parsed.path)
+    try:
+        visitor = ComplexityVisitor.from_ast(parsed.tree)
+    except Exception as e:
+        return (str(e),) * (1 + metrics)
+    results = (radon_engine.blocks_from_visitor(filename, visitor.blocks),)
+    if metrics:
+        try:
+            results += ([radon_engine.file_metrics(filename, "".join(parsed.lines), parsed.tree,
+                                                   visitor.total_complexity)],)
+        except Exception as e:
+            results += (str(e),)
+    return results
+
+
+# The lines and AST alone, for the engines that leave tokenizing to flake8
+def _parse_tree(file_path, lines):
+    try:
+        return ParsedFile(file_path, lines, None, ast.parse("".join(lines)), None)
+    except (SyntaxError, ValueError) as e:
+        return ParsedFile(file_path, lines, None, None, str(e))
+
+
+# The engines below take mapped.Source objects, so a sample read once by
+# evaluate() (from a folder or a corpus archive) is never read again here.
+# Each parses a file once for everything it computes in this process; with
+# `metrics` it yields radon raw/MI/Halstead after the radon blocks. flake8
+# and radon are timed as their own stages, leaving decoding and the parse
+# to the caller's (evaluate() times these engines as "analysis").
+
+# --- Radon raw/MI/Halstead alone, next to engines that analyze elsewhere ---
+def iter_radon_metrics(sources):
+    for source in sources:
+        _, metrics = _radon(_parse_tree(source.path, buffer_lines(source.buffer)), metrics=True)
+        yield source.path, metrics
+
+
+# --- Radon cc, on the same decoded lines the shared engine parses ---
+def iter_radon(sources, metrics=False):
+    for source in sources:
+        yield (source.path,) + _radon(_parse_tree(source.path, buffer_lines(source.buffer)), metrics)
+
+
+# --- In-process engine: flake8 with its own tokenizer and AST, and radon,
+# both on lines decoded once ---
+def iter_inprocess(sources, linter=None, metrics=False):
+    for source in sources:
+        if linter is None:
+            with timing.stage("flake8 startup"):
+                linter = Linter()
+        lines = buffer_lines(source.buffer)
+        with timing.stage("flake8", source.path):
+            violations = linter.lint_checker(_shared_checker(linter, ParsedFile(source.path, lines, None, None, None)))
+        parsed = _parse_tree(source.path, lines)
+        with timing.stage("radon", source.path):
+            radon = _radon(parsed, metrics)
+        yield (source.path, violations) + radon
+
+
+# --- Shared engine: flake8 (pyflakes + pycodestyle) and radon over one parse ---
+def iter_shared(sources, linter=None, metrics=False):
+    for source in sources:
+        linter = linter or Linter()
+        parsed = parse_lines(source.path, buffer_lines(source.buffer))
+        with timing.stage("flake8", source.path):
+            violations = linter.lint_checker(_shared_checker(linter, parsed))
+        with timing.stage("radon", source.path):
+            radon = _radon(parsed, metrics)
+        yield (source.path, violations) + radon
@@ -0,0 +1,155 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from evaluator import mapped
+from evaluator.corpus import DEFAULT_FOLDERS, Variant, load_variants, sample_id, variant_paths
+
+# Packed corpus: every sample of every variant in one file, so a run does one
+# open instead of thousands of tiny file lookups. Layout:
+#
+#   header   MAGIC, format version
+#   data     sample contents, back to back
+#   index    one entry per sample: offset and size of its content, sha256,
+#            then variant, filename and sample id as length-prefixed UTF-8
+#   trailer  index offset, entry count, MAGIC
+#
+# The index is read once on open; contents are sliced from a read-only map.
+MAGIC = b"PYCORPUS"
+VERSION = 1
+EXTENSION = ".pycorpus"
+
+_HEADER = struct.Struct("<8sI")
+_ENTRY = struct.Struct("<QQ32sHHH")
+_TRAILER = struct.Struct("<QQ8s")
+
+Entry = namedtuple("Entry", "variant filename sample offset size digest")
+
+
+def is_archive(path):
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class CorpusArchive:
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(self.path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = _HEADER.unpack_from(self.buffer, 0)
+        index_offset, count, end_magic = _TRAILER.unpack_from(self.buffer, len(self.buffer) - _TRAILER.size)
+        if magic != MAGIC or end_magic != MAGIC:
+            raise ValueError(f"{path} is not a corpus archive")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported corpus archive version {version}")
+
+        self.entries = []
+        position = index_offset
+        for _ in range(count):
+            offset, size, digest, *lengths = _ENTRY.unpack_from(self.buffer, position)
+            position += _ENTRY.size
+            fields = []
+            for length in lengths:
+                fields.append(self.buffer[position:position + length].decode("utf-8"))
+                position += length
+            self.entries.append(Entry(*fields, offset, size, digest.hex()))
+        # Evaluator paths are <archive>/<variant>/<filename>, as if unpacked
+        self.by_path = {self.entry_path(entry): entry for entry in self.entries}
+
+    def entry_path(self, entry):
+        return os.path.join(self.path, entry.variant, entry.filename)
+
+    # Variants in archive order, with their folder pointing inside the archive
+    def variants(self):
+        filenames = {}
+        for entry in self.entries:
+            filenames.setdefault(entry.variant, []).append(entry.filename)
+        return [Variant(name, os.path.join(self.path, name), names) for name, names in filenames.items()]
+
+    def read(self, entry):
+        return self.buffer[entry.offset:entry.offset + entry.size]
+
+    def read_path(self, file_path):
+        return self.read(self.by_path[file_path])
+
+    # The content hash stored at pack time, so cache lookups never rehash
+    def digest(self, file_path):
+        return self.by_path[file_path].digest
+
+    def source(self, file_path):
+        return mapped.Source(file_path, self.read_path(file_path), self.digest(file_path))
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Import: packs the .py samples of `folders` into one archive
+def pack(folders, archive_path):
+    entries = []
+    with open(archive_path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, VERSION))
+        for variant in load_variants(folders):
+            for file_path in variant_paths(variant):
+                with open(file_path, "rb") as f:
+                    data = f.read()
+                filename = os.path.basename(file_path)
+                entries.append(Entry(variant.name, filename, sample_id(filename), out.tell(), len(data),
+                                     hashlib.sha256(data).hexdigest()))
+                out.write(data)
+
+        index_offset = out.tell()
+        for entry in entries:
+            names = [field.encode("utf-8") for field in (entry.variant, entry.filename, entry.sample)]
+            digest = bytes.fromhex(entry.digest)
+            out.write(_ENTRY.pack(entry.offset, entry.size, digest, *(len(name) for name in names)))
+            for name in names:
+                out.write(name)
+        out.write(_TRAILER.pack(index_offset, len(entries), MAGIC))
+    return len(entries)
+
+
+# Export: recreates <dest>/<variant>/<filename> for every sample
+def unpack(archive_path, dest):
+    with CorpusArchive(archive_path) as archive:
+        for entry in archive.entries:
+            folder = os.path.join(dest, entry.variant)
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, entry.filename), "wb") as f:
+                f.write(archive.read(entry))
+        return len(archive.entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m evaluator.archive",
+                                     description="Pack corpus folders into one archive, or unpack it again")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack_parser = commands.add_parser("pack", help="import corpus folders into an archive")
+    pack_parser.add_argument("archive", help=f"archive to write (e.g. corpus{EXTENSION})")
+    pack_parser.add_argument("folders", nargs="*", default=list(DEFAULT_FOLDERS),
+                             help="corpus folders to pack (default: original black chatgpt)")
+    unpack_parser = commands.add_parser("unpack", help="export an archive to the folder layout")
+    unpack_parser.add_argument("archive")
+    unpack_parser.add_argument("dest", nargs="?", default=".", help="where the variant folders are created")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        count = pack(args.folders, args.archive)
+        print(f"✅ Packed {count} samples from {len(args.folders)} folders into '{args.archive}'")
+    else:
+        count = unpack(args.archive, args.dest)
+        print(f"✅ Unpacked {count} samples into '{args.dest}'")
+
+
+if __name__ == "__main__":
+    main()
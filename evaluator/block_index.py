@@ -0,0 +1,134 @@
+import argparse
+import sqlite3
+from collections import namedtuple
+
+from evaluator.corpus import sample_id, sample_order
+from evaluator.radon_engine import qualified_names
+
+# Persistent index of every radon block across the dataset, keyed by
+# (sample, variant, qualified name), e.g. ("ex23", "chatgpt",
+# "validate_user_data_nested"). Lookups go through the primary key and
+# complexity range queries through an index on cc, so questions about a few
+# functions across formatters are answered without rerunning anything.
+DEFAULT_INDEX_FILE = "blocks.sqlite"
+
+# One block. loc spans line..endline; violations counts the flake8
+# violations reported on those lines (a class includes its methods').
+BlockRow = namedtuple("BlockRow", "sample variant name filename kind line endline cc rank loc violations")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    sample TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    name TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    endline INTEGER NOT NULL,
+    cc INTEGER NOT NULL,
+    rank TEXT NOT NULL,
+    loc INTEGER NOT NULL,
+    violations INTEGER NOT NULL,
+    PRIMARY KEY (sample, variant, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS blocks_cc ON blocks (cc);
+CREATE INDEX IF NOT EXISTS blocks_file ON blocks (variant, filename);
+"""
+
+
+def block_rows(variant_name, filename, violations, blocks):
+    if isinstance(blocks, str):
+        return []
+    lines = [violation.line for violation in violations]
+    sample = sample_id(filename)
+    return [
+        BlockRow(sample, variant_name, name, filename, block.kind, block.line, block.endline, block.complexity,
+                 block.rank, block.endline - block.line + 1,
+                 sum(1 for line in lines if block.line <= line <= block.endline))
+        for name, block in zip(qualified_names(blocks), blocks)
+    ]
+
+
+class BlockIndex:
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+        self._seen = {}
+
+    # Replaces one file's rows with its latest results
+    def add_file(self, variant_name, filename, violations, blocks):
+        self.db.execute("DELETE FROM blocks WHERE variant = ? AND filename = ?", (variant_name, filename))
+        self.db.executemany("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            block_rows(variant_name, filename, violations, blocks))
+        self._seen.setdefault(variant_name, set()).add(filename)
+
+    # Drops rows of files that were not added since the last commit, for the
+    # variants that were (samples deleted from the corpus)
+    def prune(self):
+        for variant_name, filenames in self._seen.items():
+            stored = self.db.execute("SELECT DISTINCT filename FROM blocks WHERE variant = ?", (variant_name,))
+            stale = [(variant_name, filename) for (filename,) in stored if filename not in filenames]
+            self.db.executemany("DELETE FROM blocks WHERE variant = ? AND filename = ?", stale)
+
+    def commit(self):
+        self.db.commit()
+        self._seen.clear()
+
+    def get(self, sample, variant_name, name):
+        row = self.db.execute("SELECT * FROM blocks WHERE sample = ? AND variant = ? AND name = ?",
+                              (sample, variant_name, name)).fetchone()
+        return BlockRow(*row) if row else None
+
+    # Blocks with min_cc <= cc <= max_cc (either bound optional), optionally
+    # for one variant or qualified name, most complex first
+    def query(self, min_cc=None, max_cc=None, variant_name=None, name=None):
+        clauses = []
+        params = []
+        for clause, value in (("cc >= ?", min_cc), ("cc <= ?", max_cc), ("variant = ?", variant_name),
+                              ("name = ?", name)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.db.execute(f"SELECT * FROM blocks{where} ORDER BY cc DESC, sample, variant, name", params)
+        return [BlockRow(*row) for row in rows]
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def format_row(row):
+    return (f"{row.sample:<8} {row.variant:<10} {row.kind} {row.line}:{row.endline} {row.name} - "
+            f"{row.rank} (cc {row.cc}, {row.loc} lines, {row.violations} violations)")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m evaluator.block_index",
+                                     description="Query the block index written by python -m evaluator --block-index")
+    parser.add_argument("index", nargs="?", default=DEFAULT_INDEX_FILE,
+                        help=f"index file (default: {DEFAULT_INDEX_FILE})")
+    parser.add_argument("--min-cc", type=int, default=None, help="only blocks with at least this complexity")
+    parser.add_argument("--max-cc", type=int, default=None, help="only blocks with at most this complexity")
+    parser.add_argument("--variant", default=None, help="only blocks of this variant (folder name)")
+    parser.add_argument("--name", default=None, help="only blocks with this qualified name, across samples/variants")
+    args = parser.parse_args()
+
+    with BlockIndex(args.index) as index:
+        rows = index.query(args.min_cc, args.max_cc, args.variant, args.name)
+    if args.name:
+        # One function followed across formatters reads best in sample order
+        rows.sort(key=lambda row: (sample_order(row.sample), row.variant))
+    for row in rows:
+        print(format_row(row))
+    print(f"{len(rows)} blocks")
+
+
+if __name__ == "__main__":
+    main()
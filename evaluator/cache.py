@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from importlib import metadata
+
+from evaluator.mapped import content_digest, open_mapped
+
+DEFAULT_CACHE_DIR = ".evaluation_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Packages whose versions decide each tool's output
+TOOL_PACKAGES = {
+    "flake8": ("flake8", "pycodestyle", "pyflakes", "mccabe"),
+    "radon": ("radon",),
+    "radon_metrics": ("radon",),
+}
+
+
+def file_digest(path):
+    with open_mapped(path) as buffer:
+        return content_digest(buffer)
+
+
+def _package_version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "missing"
+
+
+# The config file flake8 resolves from the working directory, searching
+# parent directories the way it does itself (None without one)
+def flake8_config_file():
+    from flake8.options.config import _find_config_file
+
+    return _find_config_file(os.path.abspath("."))
+
+
+def tool_fingerprint(tool, config=""):
+    versions = ",".join(f"{package}={_package_version(package)}" for package in TOOL_PACKAGES.get(tool, (tool,)))
+    if tool == "flake8":
+        config_file = flake8_config_file()
+        if config_file is not None:
+            config += f"{config_file}:{file_digest(config_file)};"
+    return f"{tool}|{versions}|{config}"
+
+
+# Persistent on-disk cache of tool results keyed by content hash, tool
+# version and config. Each entry is one small JSON file; reads refresh its
+# mtime so evict() can drop the least recently used entries first.
+class ResultCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = Counter()
+        self.misses = Counter()
+        # Entries written by this instance, so long-lived callers can tell
+        # whether evict() has anything new to consider
+        self.writes = 0
+        self._fingerprints = {}
+
+    def key(self, tool, *parts):
+        if tool not in self._fingerprints:
+            self._fingerprints[tool] = tool_fingerprint(tool)
+        digest = hashlib.sha256(self._fingerprints[tool].encode())
+        for part in parts:
+            digest.update(b"\0" + part.encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load(self, key):
+        try:
+            with open(self._entry_path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, tool, key):
+        return (self.get_all({tool: key}) or {}).get(tool)
+
+    # Values for {tool: key}, all or none: results computed together are
+    # recomputed together when one is missing, so only a complete set counts
+    # (and is refreshed) as hits
+    def get_all(self, keys):
+        values = {}
+        for tool, key in keys.items():
+            values[tool] = self._load(key)
+            if values[tool] is None:
+                self.misses.update(tool for tool in keys)
+                return None
+        for tool, key in keys.items():
+            os.utime(self._entry_path(key))
+            self.hits[tool] += 1
+        return values
+
+    def put(self, key, value):
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, entry_path)
+        self.writes += 1
+
+    def evict(self):
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                entry_path = os.path.join(root, name)
+                stat = os.stat(entry_path)
+                entries.append((stat.st_mtime, stat.st_size, entry_path))
+                total += stat.st_size
+
+        # Oldest first until the cache fits in max_bytes again
+        evicted = 0
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(entry_path)
+            total -= size
+            evicted += 1
+        return evicted
+
+    def summary(self):
+        tools = sorted(set(self.hits) | set(self.misses))
+        return "; ".join(f"{tool} {self.hits[tool]} hits, {self.misses[tool]} misses" for tool in tools)
@@ -0,0 +1,55 @@
+import json
+import socket
+
+from evaluator.flake8_engine import Violation
+from evaluator.radon_engine import Block
+from evaluator.records import result_decoder
+
+# Unix socket the evaluation server listens on, relative to the working directory
+DEFAULT_SOCKET = ".evaluation.sock"
+
+
+# Protocol: one JSON request line per connection, answered by one JSON line
+# per file in request order and a final {"type": "done"} line:
+#   {"paths": [...]}      -> {"type": "result", "path", "violations", "blocks"} ...
+#   {"command": "stats"}  -> {"type": "stats", ...}
+#   {"command": "shutdown"}
+# A request the server cannot finish ends with {"type": "error", "text"} instead.
+def _request(message, socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        sock.close()
+        raise SystemExit(f"No evaluation server at '{socket_path}' ({e.strerror}); "
+                         f"start one with: python -m evaluator.server --socket {socket_path}")
+    with sock, sock.makefile("r", encoding="utf-8") as lines:
+        sock.sendall((json.dumps(message) + "\n").encode())
+        for line in lines:
+            reply = json.loads(line)
+            if reply["type"] == "error":
+                raise SystemExit(f"Evaluation server: {reply['text']}")
+            if reply["type"] == "done":
+                return
+            yield reply
+
+
+# Same (path, violations, blocks) stream as evaluate.iter_results(), computed
+# by the server, so the reports are written exactly as with a local engine
+def iter_remote(paths, socket_path=DEFAULT_SOCKET):
+    decode_violations = result_decoder(Violation)
+    decode_blocks = result_decoder(Block)
+    for reply in _request({"paths": list(paths)}, socket_path):
+        file_path = reply["path"]
+        yield file_path, decode_violations(file_path, reply["violations"]), decode_blocks(file_path, reply["blocks"])
+
+
+# Reads the reply through to "done", so the server never writes to a closed socket
+def stats(socket_path=DEFAULT_SOCKET):
+    (reply,) = _request({"command": "stats"}, socket_path)
+    return reply
+
+
+def shutdown(socket_path=DEFAULT_SOCKET):
+    for _ in _request({"command": "shutdown"}, socket_path):
+        pass
@@ -0,0 +1,111 @@
+import csv
+import os
+from collections import Counter, namedtuple
+
+from evaluator import mapped
+from evaluator.corpus import sample_id, sample_order
+from evaluator.radon_engine import qualified_names
+
+COMPARISON_FILE = "comparison.csv"
+
+# What the comparison keeps from one file's results: a few ints per file,
+# so collecting them during the streaming pass stays cheap
+FileSummary = namedtuple("FileSummary", "lines codes complexity")
+
+
+def count_lines(file_path):
+    with mapped.open_mapped(file_path) as buffer:
+        return mapped.line_count(buffer)
+
+
+# `lines` is the line count when the caller already has it (evaluate() takes
+# it from the buffer it read the file into)
+def summarize(file_path, violations, blocks, lines=None):
+    complexity = {}
+    if not isinstance(blocks, str):
+        for name, block in zip(qualified_names(blocks), blocks):
+            complexity[name] = block.complexity
+    if lines is None:
+        lines = count_lines(file_path)
+    return FileSummary(lines, Counter(v.code for v in violations), complexity)
+
+
+def baseline_name(variants):
+    names = [variant.name for variant in variants]
+    return "original" if "original" in names else names[0]
+
+
+# sample id -> {variant name: path}, built once for every variant
+def index_samples(variants):
+    index = {}
+    for variant in variants:
+        for filename in variant.filenames:
+            index.setdefault(sample_id(filename), {})[variant.name] = os.path.join(variant.folder, filename)
+    return index
+
+
+def _metric_rows(sample, names, summaries):
+    yield sample, "lines", "", {name: s.lines for name, s in summaries.items()}
+    yield sample, "violations", "total", {name: sum(s.codes.values()) for name, s in summaries.items()}
+
+    codes = sorted(set().union(*(s.codes for s in summaries.values())))
+    for code in codes:
+        yield sample, "violations", code, {name: s.codes.get(code, 0) for name, s in summaries.items()}
+
+    blocks = []
+    for name in names:
+        if name in summaries:
+            blocks.extend(block for block in summaries[name].complexity if block not in blocks)
+    for block in blocks:
+        values = {name: s.complexity[block] for name, s in summaries.items() if block in s.complexity}
+        yield sample, "complexity", block, values
+
+
+# One row per (sample, metric, key) with a value column per variant and a
+# delta column per non-baseline variant (blank when either side is missing)
+def compare(variants, summaries):
+    names = [variant.name for variant in variants]
+    baseline = baseline_name(variants)
+    index = index_samples(variants)
+
+    rows = []
+    for sample in sorted(index, key=sample_order):
+        sample_summaries = {name: summaries[path] for name, path in index[sample].items() if path in summaries}
+        for sample_name, metric, key, values in _metric_rows(sample, names, sample_summaries):
+            row = {"sample": sample_name, "metric": metric, "key": key}
+            for name in names:
+                row[name] = values.get(name, "")
+            for name in names:
+                if name != baseline:
+                    both = name in values and baseline in values
+                    row[f"{name}_delta"] = values[name] - values[baseline] if both else ""
+            rows.append(row)
+    return rows
+
+
+def write_comparison(rows, variants, output_file):
+    names = [variant.name for variant in variants]
+    baseline = baseline_name(variants)
+    fieldnames = ["sample", "metric", "key"] + names + [f"{name}_delta" for name in names if name != baseline]
+    with open(output_file, "w", encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# "black vs original: 5 fewer violations, 2 more, 16 unchanged" per formatter
+def summary_lines(rows, variants):
+    baseline = baseline_name(variants)
+    lines = []
+    for variant in variants:
+        if variant.name == baseline:
+            continue
+        deltas = [
+            row[f"{variant.name}_delta"] for row in rows
+            if row["metric"] == "violations" and row["key"] == "total" and row[f"{variant.name}_delta"] != ""
+        ]
+        fewer = sum(1 for delta in deltas if delta < 0)
+        more = sum(1 for delta in deltas if delta > 0)
+        lines.append(f"{variant.name} vs {baseline}: {fewer} samples with fewer violations, "
+                     f"{more} with more, {len(deltas) - fewer - more} unchanged")
+    return lines
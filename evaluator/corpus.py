@@ -0,0 +1,59 @@
+import os
+import re
+from collections import namedtuple
+
+# A corpus folder (original/, black/, chatgpt/, ...) and the samples in it
+Variant = namedtuple("Variant", "name folder filenames")
+
+DEFAULT_FOLDERS = ("original", "black", "chatgpt")
+
+# original/ex1.py, black/ex1.py and chatgpt/cex1.py are all sample "ex1"
+_SAMPLE_RE = re.compile(r"(ex\d+)\.py$")
+_DIGITS_RE = re.compile(r"(\d+)")
+
+
+# Variants with their files in one natural sample order (ex1, ex2, ... ex10),
+# the same on every platform whatever order os.listdir() returns. The sample
+# ids of all folders are sorted once; each variant's filenames are then laid
+# out by that shared order rather than sorted again.
+def load_variants(folders):
+    listings = []
+    samples = set()
+    for folder in folders:
+        folder = os.path.abspath(folder)
+        by_sample = {}
+        for filename in os.listdir(folder):
+            if filename.endswith(".py"):
+                by_sample.setdefault(sample_id(filename), []).append(filename)
+        listings.append((folder, by_sample))
+        samples.update(by_sample)
+
+    order = sorted(samples, key=sample_order)
+    variants = []
+    for folder, by_sample in listings:
+        name = os.path.basename(folder.rstrip(os.sep))
+        filenames = [filename for sample in order for filename in sorted(by_sample.get(sample, ()))]
+        variants.append(Variant(name, folder, filenames))
+    return variants
+
+
+def variant_paths(variant):
+    return [os.path.join(variant.folder, filename) for filename in variant.filenames]
+
+
+# Changes whenever a file is rewritten; cheaper than hashing it
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def sample_id(filename):
+    match = _SAMPLE_RE.search(filename)
+    return match.group(1) if match else os.path.splitext(filename)[0]
+
+
+# Natural sort key: runs of digits compare as numbers, so ex2 comes before
+# ex10 and stem_2 before stem_10; the name itself breaks ties (ex01/ex1)
+def sample_order(sample):
+    parts = _DIGITS_RE.split(sample)
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts)), sample
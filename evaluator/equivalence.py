@@ -0,0 +1,250 @@
+import ast
+import csv
+import difflib
+import hashlib
+import os
+import platform
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from evaluator import mapped, timing
+from evaluator.compare import baseline_name, index_samples
+from evaluator.corpus import sample_order
+
+EQUIVALENCE_FILE = "equivalence.csv"
+
+# Differences listed per sample in equivalence.csv; the count covers all
+MAX_LISTED = 10
+
+# Below this many pairs a process pool costs more to start than it saves
+MIN_POOL_JOBS = 100
+
+# One differing node: what it is (e.g. "FunctionDef main") and where it
+# starts in the baseline and in the variant (None for an added or removed
+# node's missing side)
+Difference = namedtuple("Difference", "node baseline_line variant_line")
+
+# One variant of a sample checked against the baseline. error is set when
+# either side does not parse; equivalent is then None.
+Equivalence = namedtuple("Equivalence", "sample variant equivalent differences error")
+
+
+def strip_docstrings(tree):
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+    return tree
+
+
+# Digest of every node, bottom-up, over node types and field values only, so
+# positions, comments and layout never count. Equal digests mean equal
+# normalized subtrees, which the diff then skips without descending. Walks
+# an explicit stack, as deeply nested expressions (a + a + ... with
+# thousands of terms) exceed the recursion limit.
+def subtree_digests(tree):
+    digests = {}
+    stack = [(tree, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if not children_done:
+            stack.append((node, True))
+            stack.extend((child, False) for child in ast.iter_child_nodes(node))
+            continue
+        digest = hashlib.blake2b(type(node).__name__.encode(), digest_size=16)
+        for name, value in ast.iter_fields(node):
+            digest.update(b"\0" + name.encode())
+            items = value if isinstance(value, list) else [value]
+            digest.update(b"[" if isinstance(value, list) else b"=")
+            for item in items:
+                digest.update(digests[id(item)] if isinstance(item, ast.AST) else repr(item).encode())
+        digests[id(node)] = digest.digest()
+    return digests
+
+
+def describe(node):
+    name = getattr(node, "name", None)
+    return f"{type(node).__name__} {name}" if isinstance(name, str) else type(node).__name__
+
+
+def _line(node):
+    return getattr(node, "lineno", None)
+
+
+# Collects the smallest differing nodes under two nodes with different
+# digests. Statement and expression lists are aligned by digest first, so an
+# inserted statement shows up once instead of shifting everything after it.
+# Like subtree_digests it keeps its own stack of steps: ("diff", a, b) to
+# descend, ("add", difference) to report, and ("leaf", a, b, found) to
+# report a node whose children turned out equal.
+def _diff(a, b, digests_a, digests_b, out):
+    stack = [("diff", a, b)]
+    while stack:
+        step = stack.pop()
+        if step[0] == "add":
+            out.append(step[1])
+        elif step[0] == "leaf":
+            _, a, b, found = step
+            if len(out) == found:
+                # Differs in a plain value (a name, constant, operator) of this node
+                out.append(Difference(describe(a), _line(a), _line(b)))
+        else:
+            _, a, b = step
+            if type(a) is not type(b):
+                out.append(Difference(describe(a), _line(a), _line(b)))
+                continue
+            steps = []
+            for (_, value_a), (_, value_b) in zip(ast.iter_fields(a), ast.iter_fields(b)):
+                if isinstance(value_a, list) and isinstance(value_b, list):
+                    steps.extend(_diff_lists(value_a, value_b, digests_a, digests_b))
+                elif isinstance(value_a, ast.AST) and isinstance(value_b, ast.AST):
+                    if digests_a[id(value_a)] != digests_b[id(value_b)]:
+                        steps.append(("diff", value_a, value_b))
+            stack.append(("leaf", a, b, len(out)))
+            stack.extend(reversed(steps))
+
+
+# The steps (see _diff) for two differing lists of fields
+def _diff_lists(items_a, items_b, digests_a, digests_b):
+    def key(item, digests):
+        return digests[id(item)] if isinstance(item, ast.AST) else repr(item)
+
+    keys_a = [key(item, digests_a) for item in items_a]
+    keys_b = [key(item, digests_b) for item in items_b]
+    matcher = difflib.SequenceMatcher(None, keys_a, keys_b, autojunk=False)
+    steps = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        pairs = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for a, b in zip(items_a[i1:i1 + pairs], items_b[j1:j1 + pairs]):
+            if isinstance(a, ast.AST) and isinstance(b, ast.AST):
+                steps.append(("diff", a, b))
+            else:
+                steps.append(("add", Difference(repr(a), None, None)))
+        for a in items_a[i1 + pairs:i2]:
+            steps.append(("add", Difference(describe(a) if isinstance(a, ast.AST) else repr(a), _line(a), None)))
+        for b in items_b[j1 + pairs:j2]:
+            steps.append(("add", Difference(describe(b) if isinstance(b, ast.AST) else repr(b), None, _line(b))))
+    return steps
+
+
+# Differing nodes between two sources, [] when they are equivalent
+def compare_sources(baseline, variant, ignore_docstrings=True):
+    trees = [ast.parse(source) for source in (baseline, variant)]
+    if ignore_docstrings:
+        trees = [strip_docstrings(tree) for tree in trees]
+    digests_a, digests_b = (subtree_digests(tree) for tree in trees)
+    differences = []
+    if digests_a[id(trees[0])] != digests_b[id(trees[1])]:
+        _diff(trees[0], trees[1], digests_a, digests_b, differences)
+    return differences
+
+
+# Runs in a pool worker: (sample, variant, baseline source, variant source,
+# ignore_docstrings). A pair nested too deeply for ast.parse itself is
+# reported as an error rather than failing the run.
+def check(job):
+    sample, variant, baseline, source, ignore_docstrings = job
+    try:
+        differences = compare_sources(baseline, source, ignore_docstrings)
+    except (SyntaxError, ValueError) as e:
+        return Equivalence(sample, variant, None, [], str(e))
+    except RecursionError:
+        return Equivalence(sample, variant, None, [], "maximum recursion depth exceeded")
+    return Equivalence(sample, variant, not differences, differences, None)
+
+
+def _check_all(jobs, workers):
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1 or len(jobs) < MIN_POOL_JOBS:
+        return [check(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(check, jobs, chunksize=chunksize))
+
+
+def _read(file_path, corpus_archive):
+    if corpus_archive is not None:
+        return mapped.decode(corpus_archive.read_path(file_path))
+    with mapped.open_mapped(file_path) as buffer:
+        return mapped.decode(buffer)
+
+
+# Checks every non-baseline variant of every sample against the baseline
+# (original/ when evaluated). Pairs seen before are served from the result
+# cache by the content hashes of both sides. Returns Equivalence results in
+# sample order, then variant order.
+def check_variants(variants, jobs=None, cache=None, ignore_docstrings=True, corpus_archive=None):
+    baseline = baseline_name(variants)
+    index = index_samples(variants)
+    names = [variant.name for variant in variants if variant.name != baseline]
+
+    pairs = []
+    for sample in sorted(index, key=sample_order):
+        paths = index[sample]
+        if baseline in paths:
+            pairs.extend((sample, name, paths[baseline], paths[name]) for name in names if name in paths)
+
+    sources = {}
+    keys = {}
+    hits = {}
+    for sample, name, baseline_path, variant_path in pairs:
+        for file_path in (baseline_path, variant_path):
+            if file_path not in sources:
+                with timing.stage("read", file_path):
+                    sources[file_path] = _read(file_path, corpus_archive)
+        if cache is not None:
+            digests = [hashlib.sha256(sources[path].encode("utf-8")).hexdigest()
+                       for path in (baseline_path, variant_path)]
+            keys[sample, name] = cache.key("equivalence", *digests, str(ignore_docstrings),
+                                           platform.python_version())
+            cached = cache.get("equivalence", keys[sample, name])
+            if cached is not None:
+                equivalent, differences, error = cached
+                hits[sample, name] = Equivalence(sample, name, equivalent,
+                                                 [Difference(*d) for d in differences], error)
+
+    misses = [(sample, name, sources[baseline_path], sources[variant_path], ignore_docstrings)
+              for sample, name, baseline_path, variant_path in pairs if (sample, name) not in hits]
+    with timing.stage("equivalence"):
+        fresh = {(result.sample, result.variant): result for result in _check_all(misses, jobs)}
+    if cache is not None:
+        for pair, result in fresh.items():
+            cache.put(keys[pair], [result.equivalent, [list(d) for d in result.differences], result.error])
+
+    return [hits.get((sample, name)) or fresh[sample, name] for sample, name, _, _ in pairs]
+
+
+def format_difference(difference):
+    lines = "/".join("-" if line is None else str(line) for line in difference[1:])
+    return f"{difference.node}@{lines}"
+
+
+def write_equivalence(results, variants, output_file):
+    baseline = baseline_name(variants)
+    with open(output_file, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["sample", "variant", "baseline", "equivalent", "differences", "nodes", "error"])
+        for result in results:
+            equivalent = "" if result.equivalent is None else int(result.equivalent)
+            nodes = "; ".join(format_difference(d) for d in result.differences[:MAX_LISTED])
+            writer.writerow([result.sample, result.variant, baseline, equivalent, len(result.differences),
+                             nodes, result.error or ""])
+
+
+# "black vs original: 23 equivalent, 0 differ, 0 unparseable" per variant
+def summary_lines(results, variants):
+    baseline = baseline_name(variants)
+    lines = []
+    for variant in variants:
+        if variant.name == baseline:
+            continue
+        checked = [result for result in results if result.variant == variant.name]
+        equivalent = sum(1 for result in checked if result.equivalent)
+        errors = sum(1 for result in checked if result.error)
+        lines.append(f"{variant.name} vs {baseline}: {equivalent} equivalent, "
+                     f"{len(checked) - equivalent - errors} differ, {errors} unparseable")
+    return lines
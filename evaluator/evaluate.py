@@ -0,0 +1,347 @@
+import os
+from collections import deque, namedtuple
+
+from evaluator import compare as comparison
+from evaluator import equivalence as equivalence_check
+from evaluator import analysis, archive, block_index, client, flake8_engine, formatting, incremental, mapped, metrics
+from evaluator import orchestrator, radon_engine, report, timing
+from evaluator.cache import ResultCache
+from evaluator.corpus import load_variants, variant_paths
+from evaluator.flake8_engine import Violation
+from evaluator.radon_engine import Block, FileMetrics
+from evaluator.records import encode_result, result_decoder
+
+# "shared" runs flake8 and radon over a single read/tokenize/parse per file;
+# "async" runs both as concurrent subprocesses through the orchestrator
+ENGINES = flake8_engine.ENGINES + ("shared", "async")
+
+# Engines that can evaluate a corpus archive; both run as the shared engine
+ARCHIVE_ENGINES = ("inprocess", "shared")
+
+# Engines whose radon results come from radon's own CLI
+RADON_CLI_ENGINES = ("subprocess", "batch", "async")
+
+
+def _radon_parts(engine):
+    return radon_engine.cli_cache_parts() if engine in RADON_CLI_ENGINES else ()
+
+
+# Result decoders of the cached tools
+DECODERS = {
+    "flake8": result_decoder(Violation),
+    "radon": result_decoder(Block),
+    "radon_metrics": result_decoder(FileMetrics),
+}
+
+# One file on its way through _stream(): its mapped.Source (None when
+# nothing needs the file's content), its cache key and its result per tool.
+# results starts with what is already known (cache hits, results reused by
+# --since); the engines fill in the rest.
+Pending = namedtuple("Pending", "path source keys results")
+
+# analyze(items) yields (path, result per tool) for an iterable of Pending;
+# reads_source marks engines that analyze the Source's buffer in-process
+# rather than have the file read elsewhere (subprocesses, pool, server)
+Engine = namedtuple("Engine", "tools analyze reads_source")
+
+
+# `groups` are the tools of each engine, whose cached results are only used
+# when the whole group has them, as the engine otherwise runs again anyway.
+# `parts` are added to a tool's keys, for results that depend on more than
+# the tool's version and the file's content. One digest serves every tool.
+def _lookup(file_path, source, groups, cache, parts, known):
+    results = dict(known)
+    keys = {}
+    if cache is not None:
+        with timing.stage("cache", file_path):
+            for tools in groups:
+                group_keys = {tool: cache.key(tool, source.digest, *parts.get(tool, ()))
+                              for tool in tools if tool not in results}
+                if not group_keys:
+                    continue
+                keys.update(group_keys)
+                cached = cache.get_all(group_keys)
+                for tool, value in (cached or {}).items():
+                    results[tool] = DECODERS[tool](file_path, value)
+    return Pending(file_path, source, keys, results)
+
+
+# Yields a Pending per file in the order of `paths`, with every tool's
+# result filled in. A file goes to an engine when any of its tools has no
+# result yet, and that one pass refreshes all of them. Files are looked up
+# only when the stream reaches them, or when an engine reading ahead asks
+# for its next file, so results are written as they come and only that
+# read-ahead is held in memory; a Source's buffer is released as soon as
+# no in-process engine still needs it. lookup() returns None for a file to
+# leave out. Results of tools that ran out of time (orchestrator.TimedOut)
+# are not cached.
+def _stream(paths, lookup, engines, cache):
+    paths = iter(paths)
+    pending = deque()
+    queues = [deque() for _ in engines]
+
+    def needs(item, tools):
+        return any(tool not in item.results for tool in tools)
+
+    def advance():
+        file_path = next(paths, None)
+        if file_path is None:
+            return False
+        item = lookup(file_path)
+        if item is None:
+            return True
+        pending.append(item)
+        reading = False
+        for engine, queue in zip(engines, queues):
+            if needs(item, engine.tools):
+                queue.append(item)
+                reading = reading or engine.reads_source
+        if item.source is not None and not reading:
+            item.source.release()
+        return True
+
+    def feed(queue):
+        while queue or advance():
+            if queue:
+                yield queue.popleft()
+
+    streams = [engine.analyze(feed(queue)) for engine, queue in zip(engines, queues)]
+    while pending or advance():
+        if not pending:
+            continue
+        item = pending.popleft()
+        for engine, stream in zip(engines, streams):
+            if needs(item, engine.tools):
+                _, *results = next(stream)
+                for tool, result in zip(engine.tools, results):
+                    item.results[tool] = result
+                    if tool in item.keys and not isinstance(result, orchestrator.TimedOut):
+                        cache.put(item.keys[tool], encode_result(result))
+        if item.source is not None:
+            item.source.release()
+        yield item
+
+
+def _paths(items):
+    return (item.path for item in items)
+
+
+def _sources(items):
+    return (item.source for item in items)
+
+
+# `linter` is a warm flake8 Linter to reuse for the in-process engines.
+# Samples of a corpus archive are always analyzed by the shared engine, the
+# one built for sources already in memory. With a running evaluation server
+# (python -m evaluator.server) flake8 and radon run there.
+def _engines(engine, jobs, timeouts, chunk_size, linter, corpus_archive, server, radon_metrics):
+    if server:
+        return [Engine(("flake8", "radon"), lambda items: timing.timed_iter(
+            "server", client.iter_remote(_paths(items), server)), False)]
+    # The in-process engines compute radon raw/MI/Halstead from the parse
+    # they already made for cc
+    metrics = ("radon_metrics",) if radon_metrics else ()
+    if corpus_archive is not None or engine == "shared":
+        return [Engine(("flake8", "radon") + metrics, lambda items: timing.timed_iter(
+            "analysis", analysis.iter_shared(_sources(items), linter, radon_metrics)), True)]
+    if engine == "inprocess":
+        return [Engine(("flake8", "radon") + metrics, lambda items: timing.timed_iter(
+            "analysis", analysis.iter_inprocess(_sources(items), linter, radon_metrics)), True)]
+    if engine == "async":
+        return [Engine(("flake8", "radon"), lambda items: timing.timed_iter(
+            "subprocesses", orchestrator.iter_async(_paths(items), jobs, timeouts, chunk_size)), False)]
+    if engine == "parallel":
+        radon = Engine(("radon",) + metrics, lambda items: timing.timed_iter(
+            "radon", analysis.iter_radon(_sources(items), radon_metrics)), True)
+    else:
+        radon = Engine(("radon",), lambda items: timing.timed_iter(
+            "radon", radon_engine.iter_subprocess(_paths(items))), False)
+    return [Engine(("flake8",), lambda items: timing.timed_iter(
+        "flake8", flake8_engine.iter_results(engine, _paths(items), jobs, chunk_size, linter)), False), radon]
+
+
+# Yields (path, violations, blocks, metrics, lines) in the order of `paths`,
+# from the cache where it has them and from `engine` otherwise. Each file is
+# read once (mapped.Source) when anything here needs its content: the cache
+# digest, an in-process engine, or its line count when `line_counts` is set
+# (lines is None otherwise). metrics is the radon raw/MI/Halstead result with
+# radon_metrics, else None. `reuse` maps paths to (violations, blocks)
+# already known (--since); only their metrics are still looked up. With
+# `on_unreadable`, a file that cannot be read (e.g. deleted since it was
+# listed) is handed to it and left out instead of failing the stream.
+def iter_files(paths, engine="inprocess", jobs=None, cache=None, timeouts=None, chunk_size=None, linter=None,
+               corpus_archive=None, server=None, radon_metrics=False, reuse=None, line_counts=False,
+               on_unreadable=None):
+    engines = _engines(engine, jobs, timeouts, chunk_size, linter, corpus_archive, server, radon_metrics)
+    if radon_metrics and not any("radon_metrics" in engine_tools for engine_tools, _, _ in engines):
+        engines.append(Engine(("radon_metrics",), lambda items: timing.timed_iter(
+            "radon metrics", analysis.iter_radon_metrics(_sources(items))), True))
+    groups = [engine_tools for engine_tools, _, _ in engines]
+    tools = [tool for engine_tools in groups for tool in engine_tools]
+    local_tools = {tool for engine_tools, _, reads_source in engines if reads_source for tool in engine_tools}
+    open_source = corpus_archive.source if corpus_archive is not None else mapped.open_source
+    parts = {"radon": _radon_parts(engine)}
+    reuse = reuse or {}
+
+    def lookup(file_path):
+        known = dict(zip(("flake8", "radon"), reuse[file_path])) if file_path in reuse else {}
+        missing = [tool for tool in tools if tool not in known]
+        source = None
+        if line_counts or (cache is not None and missing) or local_tools.intersection(missing):
+            with timing.stage("read", file_path):
+                try:
+                    source = open_source(file_path)
+                except OSError:
+                    if on_unreadable is None:
+                        raise
+                    on_unreadable(file_path)
+                    return None
+        return _lookup(file_path, source, groups, cache, parts, known)
+
+    for item in _stream(paths, lookup, engines, cache):
+        lines = item.source.line_count if item.source is not None else None
+        yield item.path, item.results["flake8"], item.results["radon"], item.results.get("radon_metrics"), lines
+
+
+# Same stream as (path, violations, blocks), for the watcher and the server
+def iter_results(paths, engine="inprocess", jobs=None, cache=None, timeouts=None, chunk_size=None,
+                 linter=None, corpus_archive=None, on_unreadable=None):
+    results = iter_files(paths, engine, jobs, cache, timeouts, chunk_size, linter, corpus_archive,
+                         on_unreadable=on_unreadable)
+    for file_path, violations, blocks, _, _ in results:
+        yield file_path, violations, blocks
+
+
+def evaluate(folders, engine="inprocess", jobs=None, output_dir=None, cache_dir=None, jsonl=False,
+             compare=False, metrics_file=None, since=None, extra_tools=(), timeouts=None,
+             chunk_size=None, profile=False, trace_file=None, server=None, format_black=False,
+             equivalence=False, ignore_docstrings=True, block_index_file=None,
+             radon_metrics=False):
+    output_dir = output_dir or os.getcwd()
+    if metrics_file:
+        metrics.check_dependencies(metrics_file)
+    # A single packed corpus (python -m evaluator.archive) stands in for its folders
+    corpus_archive = None
+    if len(folders) == 1 and archive.is_archive(folders[0]):
+        if engine not in ARCHIVE_ENGINES or since or extra_tools or server or format_black:
+            raise SystemExit(f"A corpus archive is read in-process: use --engine {' or '.join(ARCHIVE_ENGINES)}, "
+                             "without --since, --extra-tools, --server or --format")
+        corpus_archive = archive.CorpusArchive(folders[0])
+    profiler = timing.enable() if profile or trace_file else None
+    # With a running evaluation server (python -m evaluator.server) the
+    # analysis, and its cache, live there; reports are still written here
+    cache = ResultCache(cache_dir) if cache_dir and not server else None
+
+    # --format regenerates black/ from original/ before either is listed
+    if format_black:
+        source, dest = formatting.format_folders(folders)
+        formatted = formatting.format_corpus(source, dest, jobs, cache)
+        formatting.write_formatting(formatted, os.path.join(output_dir, formatting.FORMATTING_FILE))
+        print(f"✅ Black formatting: {formatting.summary_line(formatted)}. "
+              f"Check '{formatting.FORMATTING_FILE}'")
+
+    with timing.stage("list"):
+        if corpus_archive is not None:
+            variants = corpus_archive.variants()
+        else:
+            variants = load_variants(folders)
+
+    # Both --since and --radon-metrics work on the JSONL records
+    if since or radon_metrics:
+        jsonl = True
+
+    # --since reuses the last JSONL records for every file git reports as
+    # unchanged, so those records must be read before the writers reopen them
+    reuse = {}
+    if since:
+        reuse = incremental.reusable_results(since, variants, output_dir)
+
+    # AST equivalence of every variant with the baseline; printed with the other summaries
+    checked = None
+    if equivalence:
+        checked = equivalence_check.check_variants(variants, jobs, cache, ignore_docstrings, corpus_archive)
+        equivalence_check.write_equivalence(checked, variants,
+                                            os.path.join(output_dir, equivalence_check.EQUIVALENCE_FILE))
+
+    # Extra subprocess tools run alongside the main pass and write their own files
+    extra = None
+    if extra_tools:
+        extra = orchestrator.start_extra_tools(variants, extra_tools, output_dir, jobs, timeouts)
+
+    # Per-block rows for the persistent block index, updated file by file
+    index = block_index.BlockIndex(block_index_file) if block_index_file else None
+
+    # Every variant goes through the same tool instances, file by file
+    writers = {}
+    owners = {}
+    summaries = {}
+    for variant in variants:
+        writers[variant.name] = report.ReportWriter(variant, output_dir, jsonl=jsonl)
+        for path in variant_paths(variant):
+            owners[path] = variant.name
+
+    try:
+        # Radon raw/MI/Halstead are added for every file, reused ones too
+        results = iter_files(list(owners), engine, jobs, cache, timeouts, chunk_size, corpus_archive=corpus_archive,
+                             server=server, radon_metrics=radon_metrics, reuse=reuse,
+                             line_counts=bool(compare or metrics_file))
+        for file_path, violations, blocks, metrics_result, lines in results:
+            with timing.stage("write", file_path):
+                writers[owners[file_path]].add(os.path.basename(file_path), violations, blocks, metrics_result)
+            if compare or metrics_file:
+                with timing.stage("summarize", file_path):
+                    summaries[file_path] = comparison.summarize(file_path, violations, blocks, lines)
+            if index is not None:
+                with timing.stage("index", file_path):
+                    index.add_file(owners[file_path], os.path.basename(file_path), violations, blocks)
+        if index is not None:
+            index.prune()
+            index.commit()
+    finally:
+        for variant in variants:
+            # --profile appends this variant's share of the run to its report
+            profile_lines = None
+            if profile:
+                profile_lines = profiler.summary_lines(variant_paths(variant))
+            with timing.stage("write"):
+                writers[variant.name].close(profile_lines)
+        timing.disable()
+        if index is not None:
+            index.close()
+        if corpus_archive is not None:
+            corpus_archive.close()
+
+    if extra is not None:
+        extra.join()
+    if since:
+        print(f"Incremental since {since}: {len(owners) - len(reuse)} files re-evaluated, {len(reuse)} reused")
+    for variant in variants:
+        print(f"✅ Flake8 and Radon evaluation complete. Check '{report.report_filename(variant)}'")
+    if compare:
+        rows = comparison.compare(variants, summaries)
+        comparison.write_comparison(rows, variants, os.path.join(output_dir, comparison.COMPARISON_FILE))
+        for line in comparison.summary_lines(rows, variants):
+            print(line)
+        print(f"✅ Comparison complete. Check '{comparison.COMPARISON_FILE}'")
+    if checked is not None:
+        for line in equivalence_check.summary_lines(checked, variants):
+            print(line)
+        print(f"✅ Equivalence check complete. Check '{equivalence_check.EQUIVALENCE_FILE}'")
+    if index is not None:
+        print(f"✅ Block index updated. Check '{block_index_file}' (python -m evaluator.block_index)")
+    if metrics_file:
+        matrix = metrics.build_matrix(variants, summaries)
+        metrics.save_matrix(matrix, metrics_file)
+        print(f"✅ Metrics matrix ({len(matrix.samples)} samples x {len(matrix.variants)} variants x "
+              f"{len(matrix.features)} features) written to '{metrics_file}'")
+    if cache is not None:
+        cache.evict()
+        print(f"Cache: {cache.summary()}")
+    if profile:
+        print("Profile:")
+        for line in profiler.summary_lines():
+            print(line)
+    if trace_file:
+        profiler.write_trace(trace_file)
+        print(f"✅ Chrome trace written to '{trace_file}'")
+    return variants
@@ -0,0 +1,225 @@
+import itertools
+import os
+import re
+import subprocess
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from evaluator import timing
+
+# One flake8 violation, with the path already reduced to the bare filename
+Violation = namedtuple("Violation", "filename line column code text")
+
+ENGINES = ("inprocess", "parallel", "batch", "subprocess")
+
+DEFAULT_CHUNK_SIZE = 50
+
+# Default flake8 output format: "<path>:<row>:<col>: <code> <text>"
+_LINE_RE = re.compile(r"^(?P<filename>.*?):(?P<line>\d+):(?P<column>\d+): (?P<code>\S+) (?P<text>.*)$")
+
+
+def format_violation(violation):
+    return f"{violation.filename}:{violation.line}:{violation.column}: {violation.code} {violation.text}"
+
+
+def format_violations(violations):
+    return "\n".join(format_violation(v) for v in violations)
+
+
+def parse_output(output):
+    violations = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            violations.append(Violation(
+                match["filename"],
+                int(match["line"]),
+                int(match["column"]),
+                match["code"],
+                match["text"],
+            ))
+    return violations
+
+
+# --- Subprocess engine: one flake8 interpreter per file ---
+def command(file_path):
+    return ["python", "-m", "flake8", "--filename", os.path.basename(file_path), file_path]
+
+
+def parse_file_output(file_path, output):
+    # Replace full path with just filename in output
+    with timing.stage("parse output", file_path):
+        return parse_output(output.replace(file_path, os.path.basename(file_path)).strip())
+
+
+def iter_subprocess(paths):
+    for file_path in paths:
+        result = subprocess.run(
+            command(file_path),
+            capture_output=True,
+            text=True
+        )
+        yield file_path, parse_file_output(file_path, result.stdout)
+
+
+# --- Batch engine: one flake8 interpreter per chunk of files ---
+def batch_command(paths):
+    return ["python", "-m", "flake8", *paths]
+
+
+# flake8 is run from the caller's working directory, like every other
+# engine, so it finds the same config; each output line starts with the
+# path it belongs to, reduced here to the bare filename. Files without a
+# line get []
+def parse_batch_output(folder, filenames, output):
+    names = {os.path.join(folder, filename): filename for filename in filenames}
+    violations = {filename: [] for filename in filenames}
+    with timing.stage("parse output"):
+        for violation in parse_output(output):
+            filename = names[violation.filename]
+            violations[filename].append(violation._replace(filename=filename))
+    for filename in filenames:
+        yield os.path.join(folder, filename), violations[filename]
+
+
+def chunks(paths, chunk_size):
+    from evaluator.radon_engine import group_by_folder
+
+    chunk_size = max(1, chunk_size or DEFAULT_CHUNK_SIZE)
+    for folder, filenames in group_by_folder(paths):
+        for start in range(0, len(filenames), chunk_size):
+            yield folder, filenames[start:start + chunk_size]
+
+
+def iter_batch(paths, chunk_size=None):
+    for folder, filenames in chunks(paths, chunk_size):
+        result = subprocess.run(
+            batch_command([os.path.join(folder, filename) for filename in filenames]),
+            capture_output=True,
+            text=True
+        )
+        yield from parse_batch_output(folder, filenames, result.stdout)
+
+
+# --- In-process engine: one flake8 application reused for every path ---
+class Linter:
+    def __init__(self):
+        from flake8.formatting.base import BaseFormatter
+        from flake8.main.application import Application
+        from flake8.options.parse_args import parse_args
+
+        collected = self._collected = []
+
+        class CollectingFormatter(BaseFormatter):
+            def handle(self, error):
+                collected.append(error)
+
+        # Same setup as flake8.api.legacy.get_style_guide(); --jobs 1 keeps
+        # every check inside this interpreter
+        self.app = Application()
+        self.app.plugins, self.app.options = parse_args(["--jobs", "1"])
+        self.app.formatter = CollectingFormatter(self.app.options)
+        self.app.make_guide()
+        self.app.make_file_checker_manager([])
+
+    def _violations(self, file_path):
+        filename = os.path.basename(file_path)
+        violations = [
+            Violation(filename, error.line_number, error.column_number, error.code, error.text)
+            for error in self._collected
+        ]
+        self._collected.clear()
+        return violations
+
+    def lint(self, file_path):
+        self.app.options.filenames = [file_path]
+        self.app.run_checks()
+        self.app.report_errors()
+        return self._violations(file_path)
+
+    # Lint with a prepared flake8 FileChecker, filtering its raw results
+    # through the style guide exactly like flake8's Manager.report()
+    def lint_checker(self, checker):
+        filename, results, _ = checker.run_checks()
+        results.sort(key=lambda result: (result[1], result[2]))
+        with self.app.guide.processing_file(filename):
+            for code, line_number, column, text, physical_line in results:
+                self.app.guide.handle_error(
+                    code=code,
+                    filename=filename,
+                    line_number=line_number,
+                    column_number=column,
+                    text=text,
+                    physical_line=physical_line,
+                )
+        return self._violations(filename)
+
+
+# `linter` lets a long-lived caller (the evaluation server) keep one warm
+# flake8 application across calls
+def iter_inprocess(paths, linter=None):
+    for file_path in paths:
+        if linter is None:
+            with timing.stage("flake8 startup"):
+                linter = Linter()
+        yield file_path, linter.lint(file_path)
+
+
+# --- Parallel engine: in-process flake8 spread over a process pool ---
+# Files handed to a worker at once, and chunks in flight per worker: enough
+# to keep every worker busy while bounding how far the pool reads ahead of
+# the caller (and so how many files the caller holds meanwhile)
+PARALLEL_CHUNK_SIZE = 16
+PARALLEL_READ_AHEAD = 4
+
+_worker_linter = None
+
+
+def _lint_in_worker(file_paths):
+    global _worker_linter
+    if _worker_linter is None:
+        _worker_linter = Linter()
+    return [_worker_linter.lint(file_path) for file_path in file_paths]
+
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+
+def iter_parallel(paths, jobs=None):
+    jobs = max(1, jobs or default_jobs())
+    if jobs == 1:
+        yield from iter_inprocess(paths)
+        return
+
+    # Chunks are submitted only as results are taken, and results come back
+    # in submission order, so files stream out in the caller's order
+    paths = iter(paths)
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for chunk in iter(lambda: list(itertools.islice(paths, PARALLEL_CHUNK_SIZE)), []):
+            in_flight.append((chunk, pool.submit(_lint_in_worker, chunk)))
+            if len(in_flight) >= jobs * PARALLEL_READ_AHEAD:
+                chunk, future = in_flight.popleft()
+                yield from zip(chunk, future.result())
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            yield from zip(chunk, future.result())
+
+
+def iter_results(engine, paths, jobs=None, chunk_size=None, linter=None):
+    if engine == "subprocess":
+        return iter_subprocess(paths)
+    if engine == "batch":
+        return iter_batch(paths, chunk_size)
+    if engine == "parallel":
+        return iter_parallel(paths, jobs)
+    return iter_inprocess(paths, linter)
+
+
+def run(engine, paths, jobs=None, chunk_size=None):
+    return dict(iter_results(engine, paths, jobs, chunk_size))
+
+
+def run_parallel(paths, jobs=None):
+    return dict(iter_parallel(paths, jobs))
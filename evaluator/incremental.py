@@ -0,0 +1,41 @@
+import os
+import subprocess
+
+from evaluator import records
+from evaluator.report import records_filename
+
+
+def _git(args, cwd):
+    result = subprocess.run(["git", *args], capture_output=True, text=True, cwd=cwd)
+    if result.returncode != 0:
+        raise SystemExit(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+# Real paths of files under `folders` that differ from `rev`: modified and
+# added tracked files plus untracked ones that are not ignored
+def changed_paths(rev, folders):
+    cwd = folders[0]
+    top = _git(["rev-parse", "--show-toplevel"], cwd).strip()
+    names = _git(["diff", "--name-only", "-z", rev, "--", *folders], cwd).split("\0")
+    names += _git(["ls-files", "--others", "--exclude-standard", "--full-name", "-z", "--", *folders], cwd).split("\0")
+    return {os.path.realpath(os.path.join(top, name)) for name in names if name}
+
+
+# Results of the last run from <variant>_evaluation.jsonl, keyed by path
+def load_previous(output_dir, variant):
+    records_file = os.path.join(output_dir, records_filename(variant))
+    if not os.path.exists(records_file):
+        return {}
+    results = records.results_from_records(records.load_records(records_file))
+    return {os.path.join(variant.folder, filename): result for filename, result in results.items()}
+
+
+def reusable_results(rev, variants, output_dir):
+    changed = changed_paths(rev, [variant.folder for variant in variants])
+    reuse = {}
+    for variant in variants:
+        for file_path, result in load_previous(output_dir, variant).items():
+            if os.path.realpath(file_path) not in changed:
+                reuse[file_path] = result
+    return reuse
@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from evaluator.cache import DEFAULT_CACHE_DIR, ResultCache
+from evaluator.corpus import load_variants, sample_id
+from evaluator.formatting import write_if_changed
+
+# Regenerates chatgpt/ from original/ through an "LLM formatter" backend.
+# Samples are batched into requests and the requests run concurrently, so a
+# corpus of thousands of samples costs a few round trips' worth of wall time
+# rather than one per sample. Responses are cached by prompt hash (and
+# whatever else the backend's reply depends on).
+LLM_SOURCE = "original"
+LLM_DEST = "chatgpt"
+# chatgpt/ names its samples cex1.py for original/ex1.py
+DEST_PREFIX = "c"
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_CONCURRENCY = 8
+
+PROMPT = ("Reformat the following Python code to follow PEP 8. Keep its behavior unchanged and "
+          "reply with the code only.\n\n# sample: {sample}\n{source}")
+
+_SAMPLE_RE = re.compile(r"^# sample: (\S+)$", re.MULTILINE)
+_FENCE_RE = re.compile(r"```(?:python)?\n(.*?)```", re.DOTALL)
+
+# One sample through the stage. seconds is the round trip of the request it
+# was batched into (or 0 when cached); error is the backend's message, in
+# which case nothing is written for the sample.
+LlmFormatted = namedtuple("LlmFormatted", "sample filename seconds cached changed error")
+
+
+def build_prompt(filename, source):
+    return PROMPT.format(sample=sample_id(filename), source=source)
+
+
+def prompt_digest(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+# The code of a reply, whether or not the model wrapped it in a fence
+def extract_code(response):
+    match = _FENCE_RE.search(response)
+    code = match.group(1) if match else response
+    return code if code.endswith("\n") else code + "\n"
+
+
+# --- Backends: complete(prompts) answers one batched request with a
+# (reply, error) pair per prompt, error None unless that prompt failed; a
+# failed request raises ---
+# Both are local and deterministic; `latency` sleeps once per request to
+# stand in for a remote API's round trip. cache_key(prompt) is what a cached
+# reply to `prompt` depends on besides the backend's name.
+class FixtureBackend:
+    name = "fixture"
+
+    # Replies recorded earlier, one file per sample (e.g. the hand-collected chatgpt/)
+    def __init__(self, folder=LLM_DEST, latency=0.0):
+        self.latency = latency
+        self.replies = {}
+        for variant in load_variants([folder]):
+            for filename in variant.filenames:
+                with open(os.path.join(variant.folder, filename), encoding="utf-8", newline="") as f:
+                    self.replies[sample_id(filename)] = f.read()
+
+    # The recorded reply too: the fixture folder may be the one the stage
+    # writes to, and a cached reply must never undo an edit made there
+    def cache_key(self, prompt):
+        reply = self.replies.get(_SAMPLE_RE.search(prompt).group(1), "")
+        return f"{prompt_digest(prompt)}:{hashlib.sha256(reply.encode('utf-8')).hexdigest()}"
+
+    def complete(self, prompts):
+        time.sleep(self.latency)
+        replies = []
+        for prompt in prompts:
+            sample = _SAMPLE_RE.search(prompt).group(1)
+            if sample in self.replies:
+                replies.append((f"```python\n{self.replies[sample]}```", None))
+            else:
+                replies.append((None, f"no fixture reply for {sample}"))
+        return replies
+
+
+class MockBackend:
+    name = "mock"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def cache_key(self, prompt):
+        return prompt_digest(prompt)
+
+    # "Formats" by stripping trailing whitespace and extra blank lines at the end
+    def complete(self, prompts):
+        time.sleep(self.latency)
+        replies = []
+        for prompt in prompts:
+            source = prompt[_SAMPLE_RE.search(prompt).end() + 1:]
+            lines = [line.rstrip() for line in source.splitlines()]
+            replies.append(("```python\n" + "\n".join(lines).rstrip("\n") + "\n```", None))
+        return replies
+
+
+BACKENDS = {"fixture": FixtureBackend, "mock": MockBackend}
+
+
+def make_backend(name, latency=0.0, fixture=None):
+    if name == "fixture":
+        return FixtureBackend(fixture or LLM_DEST, latency)
+    return BACKENDS[name](latency)
+
+
+def _request(backend, batch):
+    start = time.perf_counter()
+    try:
+        replies = backend.complete([prompt for _, prompt in batch])
+    except Exception as e:
+        replies = [(None, str(e))] * len(batch)
+    return batch, replies, time.perf_counter() - start
+
+
+# Sends every sample of `source` that is not cached through `backend` in
+# batches of `batch_size`, with up to `concurrency` requests in flight, and
+# writes each reply's code to `dest`. Returns one LlmFormatted per sample,
+# in sample order.
+def format_corpus(backend, source=LLM_SOURCE, dest=LLM_DEST, batch_size=DEFAULT_BATCH_SIZE,
+                  concurrency=DEFAULT_CONCURRENCY, cache=None):
+    (variant,) = load_variants([source])
+    os.makedirs(dest, exist_ok=True)
+
+    prompts = {}
+    keys = {}
+    replies = {}
+    for filename in variant.filenames:
+        with open(os.path.join(variant.folder, filename), encoding="utf-8", newline="") as f:
+            prompts[filename] = build_prompt(filename, f.read())
+        if cache is not None:
+            keys[filename] = cache.key("llm", backend.name, backend.cache_key(prompts[filename]))
+            cached = cache.get("llm", keys[filename])
+            if cached is not None:
+                replies[filename] = (cached, 0.0, None)
+
+    hits = set(replies)
+    misses = [(filename, prompts[filename]) for filename in variant.filenames if filename not in hits]
+    batches = [misses[start:start + batch_size] for start in range(0, len(misses), max(1, batch_size))]
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as pool:
+            for batch, batch_replies, seconds in pool.map(lambda b: _request(backend, b), batches):
+                for (filename, _), (reply, error) in zip(batch, batch_replies):
+                    replies[filename] = (reply, seconds, error)
+                    if cache is not None and error is None:
+                        cache.put(keys[filename], reply)
+
+    results = []
+    for filename in variant.filenames:
+        reply, seconds, error = replies[filename]
+        changed = False
+        if error is None:
+            changed = write_if_changed(os.path.join(dest, DEST_PREFIX + filename), extract_code(reply))
+        results.append(LlmFormatted(sample_id(filename), filename, seconds, filename in hits, changed, error))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m evaluator.llm_formatter",
+                                     description="Regenerate chatgpt/ from original/ through an LLM formatter backend")
+    parser.add_argument("--source", default=LLM_SOURCE, help=f"folder of samples to format (default: {LLM_SOURCE})")
+    parser.add_argument("--dest", default=LLM_DEST, help=f"folder the replies are written to (default: {LLM_DEST})")
+    parser.add_argument("--backend", choices=BACKENDS, default="fixture",
+                        help="fixture: recorded replies from --fixture; mock: deterministic whitespace cleanup")
+    parser.add_argument("--fixture", default=LLM_DEST,
+                        help=f"folder of recorded replies for --backend fixture (default: {LLM_DEST})")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds each request sleeps, standing in for a remote round trip")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"samples per request (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"requests in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"response cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="send every prompt to the backend")
+    args = parser.parse_args()
+
+    backend = make_backend(args.backend, args.latency, args.fixture)
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    start = time.perf_counter()
+    results = format_corpus(backend, args.source, args.dest, args.batch_size, args.concurrency, cache)
+    seconds = time.perf_counter() - start
+
+    sent = sum(1 for result in results if not result.cached)
+    requests = -(-sent // max(1, args.batch_size))
+    errors = [result for result in results if result.error]
+    for result in errors:
+        print(f"{result.filename}: {result.error}")
+    print(f"✅ {len(results)} samples in {seconds:.2f}s ({len(results) / seconds:.1f} samples/s), "
+          f"{requests} requests to the {backend.name} backend: {len(results) - sent} cached, "
+          f"{sum(result.changed for result in results)} rewritten, {len(errors)} errors")
+    if cache is not None:
+        cache.evict()
+        print(f"Cache: {cache.summary()}")
+
+
+if __name__ == "__main__":
+    main()
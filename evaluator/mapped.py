@@ -0,0 +1,104 @@
+import hashlib
+import io
+import mmap
+import os
+import tokenize
+from contextlib import contextmanager
+
+# Read-only buffers over sample files, handed as-is to hashlib, the line
+# counter, the encoding sniffer and the decoder. Files of at least
+# MMAP_THRESHOLD bytes are memory-mapped so those consumers read the page
+# cache directly instead of a private copy. Smaller files, which is
+# every sample in the dataset (a few KB each), are read with one read()
+# into a bytes object: mapping them costs more in page-table setup than the
+# copy it saves. Either way evaluate() reads each sample once (see Source).
+MMAP_THRESHOLD = 64 * 1024
+# Bytes sliced off a map at a time where a consumer needs a bytes object
+CHUNK_SIZE = 1024 * 1024
+
+
+# (buffer, close), close None for a plain bytes buffer
+def _read(file_path):
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        # Empty files cannot be mapped
+        if size < MMAP_THRESHOLD or not size:
+            return f.read(), None
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return buffer, buffer.close
+
+
+@contextmanager
+def open_mapped(file_path):
+    buffer, close = _read(file_path)
+    try:
+        yield buffer
+    finally:
+        if close is not None:
+            close()
+
+
+# One sample read once for a whole evaluation. The buffer is for the
+# in-process engines to decode and parse; the content hash (every tool's
+# cache key) and the line count (the comparison) are taken when it is
+# opened, so they outlive release().
+class Source:
+    def __init__(self, path, buffer, digest=None, close=None):
+        self.path = path
+        self.buffer = buffer
+        self.digest = digest or content_digest(buffer)
+        self.line_count = line_count(buffer)
+        self._close = close
+
+    def release(self):
+        if self._close is not None:
+            self._close()
+            self._close = None
+        self.buffer = None
+
+
+def open_source(file_path):
+    buffer, close = _read(file_path)
+    return Source(file_path, buffer, close=close)
+
+
+def content_digest(buffer):
+    return hashlib.sha256(buffer).hexdigest()
+
+
+# Same count as iterating the file in binary mode: newlines, plus a last
+# line without one
+def line_count(buffer):
+    if isinstance(buffer, bytes):
+        count = buffer.count(b"\n")
+    else:
+        count = sum(buffer[start:start + CHUNK_SIZE].count(b"\n") for start in range(0, len(buffer), CHUNK_SIZE))
+    if len(buffer) and buffer[len(buffer) - 1:] != b"\n":
+        count += 1
+    return count
+
+
+def _readline(buffer):
+    if isinstance(buffer, bytes):
+        # BytesIO shares the bytes object until written to
+        return io.BytesIO(buffer).readline
+    position = 0
+
+    def readline():
+        nonlocal position
+        end = buffer.find(b"\n", position)
+        end = len(buffer) if end == -1 else end + 1
+        line = buffer[position:end]
+        position = end
+        return line
+    return readline
+
+
+# Decodes the whole buffer once, with the encoding declared in the first two
+# lines (PEP 263) and flake8's latin-1 fallback
+def decode(buffer):
+    try:
+        encoding, _ = tokenize.detect_encoding(_readline(buffer))
+        return str(buffer, encoding)
+    except (SyntaxError, UnicodeError):
+        return str(buffer, "latin-1")
@@ -0,0 +1,151 @@
+import os
+from collections import namedtuple
+
+from evaluator.compare import index_samples
+from evaluator.corpus import sample_order
+
+RANKS = "ABCDEF"
+BASE_FEATURES = ["lines", "violations", "blocks", "avg_cc", "max_cc"] + [f"rank_{rank}" for rank in RANKS]
+
+# samples x variants x features, float32 with NaN where a sample has no file
+# in a variant (or no radon blocks for avg_cc/max_cc). Violation codes are
+# features named by the code itself, e.g. "E501".
+MetricsMatrix = namedtuple("MetricsMatrix", "samples variants features values")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise SystemExit("The metrics matrix needs numpy: pip install numpy")
+    return numpy
+
+
+def _pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise SystemExit("Writing the metrics matrix as .parquet needs pandas: pip install pandas pyarrow")
+    return pandas
+
+
+# pandas writes parquet through pyarrow, or fastparquet when that is what is installed
+def _parquet_engine():
+    for module in ("pyarrow", "fastparquet"):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        return module
+    raise SystemExit("Writing the metrics matrix as .parquet needs pyarrow: pip install pyarrow")
+
+
+# Fails before a run that would only find out at the end that it cannot save `path`
+def check_dependencies(path):
+    _numpy()
+    if path.endswith(".parquet"):
+        _pandas()
+        _parquet_engine()
+
+
+def _file_features(summary):
+    from radon.complexity import cc_rank
+
+    complexities = list(summary.complexity.values())
+    features = {
+        "lines": summary.lines,
+        "violations": sum(summary.codes.values()),
+        "blocks": len(complexities),
+    }
+    if complexities:
+        features["avg_cc"] = sum(complexities) / len(complexities)
+        features["max_cc"] = max(complexities)
+    for rank in RANKS:
+        features[f"rank_{rank}"] = 0
+    for complexity in complexities:
+        features[f"rank_{cc_rank(complexity)}"] += 1
+    features.update(summary.codes)
+    return features
+
+
+def build_matrix(variants, summaries):
+    np = _numpy()
+    index = index_samples(variants)
+    samples = sorted(index, key=sample_order)
+    names = [variant.name for variant in variants]
+    codes = sorted(set().union(*(summary.codes for summary in summaries.values())))
+    features = BASE_FEATURES + codes
+
+    values = np.full((len(samples), len(names), len(features)), np.nan, dtype=np.float32)
+    feature_index = {feature: i for i, feature in enumerate(features)}
+    for s, sample in enumerate(samples):
+        for v, name in enumerate(names):
+            path = index[sample].get(name)
+            if path not in summaries:
+                continue
+            # A file that exists has a real zero for every code it lacks
+            values[s, v, len(BASE_FEATURES):] = 0
+            for feature, value in _file_features(summaries[path]).items():
+                values[s, v, feature_index[feature]] = value
+    return MetricsMatrix(samples, names, features, values)
+
+
+def feature(matrix, name):
+    return matrix.values[:, :, matrix.features.index(name)]
+
+
+# Violations of `code` per 1000 lines, one value per variant
+def code_rate(matrix, code):
+    np = _numpy()
+    lines = np.nansum(feature(matrix, "lines"), axis=0)
+    if code not in matrix.features:
+        return dict(zip(matrix.variants, np.zeros(len(matrix.variants))))
+    counts = np.nansum(feature(matrix, code), axis=0)
+    return dict(zip(matrix.variants, 1000 * counts / np.maximum(lines, 1)))
+
+
+# Number of radon blocks per rank, one row per variant
+def rank_distribution(matrix):
+    np = _numpy()
+    return {
+        name: {rank: int(np.nansum(feature(matrix, f"rank_{rank}")[:, v])) for rank in RANKS}
+        for v, name in enumerate(matrix.variants)
+    }
+
+
+def to_dataframe(matrix):
+    pandas = _pandas()
+
+    # Long format: one row per (sample, variant) with a column per feature
+    rows = []
+    for s, sample in enumerate(matrix.samples):
+        for v, name in enumerate(matrix.variants):
+            rows.append([sample, name] + matrix.values[s, v].tolist())
+    return pandas.DataFrame(rows, columns=["sample", "variant"] + matrix.features)
+
+
+def save_matrix(matrix, path):
+    if path.endswith(".parquet"):
+        to_dataframe(matrix).to_parquet(path, engine=_parquet_engine(), index=False)
+        return
+    np = _numpy()
+    np.savez_compressed(
+        path,
+        values=matrix.values,
+        samples=np.array(matrix.samples),
+        variants=np.array(matrix.variants),
+        features=np.array(matrix.features),
+    )
+
+
+def load_matrix(path):
+    np = _numpy()
+    if not os.path.exists(path) and os.path.exists(path + ".npz"):
+        path += ".npz"
+    with np.load(path) as data:
+        return MetricsMatrix(
+            data["samples"].tolist(),
+            data["variants"].tolist(),
+            data["features"].tolist(),
+            data["values"],
+        )
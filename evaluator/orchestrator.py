@@ -0,0 +1,187 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from evaluator import flake8_engine, radon_engine
+
+# An external tool: command(filenames) builds its argv, run from the folder
+# holding the files with bare filenames, or with in_folder False from the
+# caller's working directory with full paths (flake8, which looks for its
+# config there, as the in-process engines do); timeout is the default
+# per-invocation limit in seconds
+Tool = namedtuple("Tool", "name command timeout in_folder")
+
+TOOLS = {
+    "flake8": Tool("flake8", flake8_engine.batch_command, 120, False),
+    "radon": Tool("radon", radon_engine.command, 120, True),
+    "pylint": Tool("pylint", lambda filenames: ["python", "-m", "pylint", "--score=n", *filenames], 300, True),
+    "mypy": Tool("mypy", lambda filenames: ["python", "-m", "mypy", "--show-column-numbers", *filenames], 300,
+                 True),
+    "ruff": Tool("ruff", lambda filenames: ["python", "-m", "ruff", "check", "--output-format=concise",
+                                            *filenames], 60, True),
+}
+
+# One subprocess to launch, and what came back from it. returncode is None
+# when the tool was killed for running past its timeout.
+Job = namedtuple("Job", "tool folder filenames")
+JobResult = namedtuple("JobResult", "job returncode stdout stderr elapsed")
+
+
+def default_concurrency():
+    return os.cpu_count() or 1
+
+
+def parse_timeouts(values):
+    timeouts = {}
+    for value in values or ():
+        tool, _, seconds = value.partition("=")
+        try:
+            seconds = float(seconds)
+        except ValueError:
+            seconds = None
+        # `not seconds >= 0` also catches nan
+        if tool not in TOOLS or seconds is None or not seconds >= 0:
+            raise SystemExit(f"--timeout expects TOOL=SECONDS with TOOL one of {', '.join(TOOLS)} "
+                             f"and SECONDS a non-negative number: {value!r}")
+        timeouts[tool] = seconds
+    return timeouts
+
+
+async def _run_job(job, semaphore, timeouts):
+    tool = TOOLS[job.tool]
+    timeout = timeouts.get(job.tool, tool.timeout)
+    if tool.in_folder:
+        filenames, cwd = job.filenames, job.folder
+    else:
+        filenames, cwd = [os.path.join(job.folder, filename) for filename in job.filenames], None
+    async with semaphore:
+        start = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *tool.command(filenames),
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return JobResult(job, None, "", f"timed out after {timeout:g}s", time.perf_counter() - start)
+        return JobResult(job, process.returncode, stdout.decode(), stderr.decode(), time.perf_counter() - start)
+
+
+# Runs every job with at most `concurrency` subprocesses alive at once and
+# hands each result to on_result as soon as that job finishes
+async def run_jobs(jobs, on_result, concurrency=None, timeouts=None):
+    semaphore = asyncio.Semaphore(concurrency or default_concurrency())
+    tasks = [asyncio.ensure_future(_run_job(job, semaphore, timeouts or {})) for job in jobs]
+    for task in asyncio.as_completed(tasks):
+        on_result(await task)
+
+
+# Runs run_jobs() on its own event loop in a background thread. Results go
+# to on_result if given, otherwise onto self.results for get(); an exception
+# that stops the loop is queued and re-raised by get() or join().
+class Background:
+    def __init__(self, jobs, concurrency=None, timeouts=None, on_result=None):
+        self.results = queue.Queue()
+        on_result = on_result or self.results.put
+        self.thread = threading.Thread(target=self._run, args=(jobs, on_result, concurrency, timeouts), daemon=True)
+        self.thread.start()
+
+    def _run(self, jobs, on_result, concurrency, timeouts):
+        try:
+            asyncio.run(run_jobs(jobs, on_result, concurrency, timeouts))
+        except BaseException as e:
+            self.results.put(e)
+
+    def get(self):
+        result = self.results.get()
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def join(self):
+        self.thread.join()
+        if not self.results.empty():
+            self.get()
+
+
+# A radon result for a file whose chunk ran out of time: reported like any
+# other radon error message, but never cached, as a rerun may well finish
+class TimedOut(str):
+    pass
+
+
+def _check(result):
+    if result.returncode is None:
+        job = result.job
+        raise SystemExit(f"{job.tool} {result.stderr} on {len(job.filenames)} files in {job.folder} "
+                         f"(from {job.filenames[0]}); raise it with --timeout {job.tool}=SECONDS")
+
+
+# --- Async engine: flake8 and radon per chunk of files as concurrent
+# subprocesses; yields (path, violations, blocks) in the order of `paths`.
+# A radon chunk that times out gives each of its files a TimedOut error;
+# flake8 has no error result, so its timeout stops the run. ---
+def iter_async(paths, concurrency=None, timeouts=None, chunk_size=None):
+    paths = list(paths)
+    # Both tools' jobs for a chunk are queued together, so files complete in
+    # order rather than after every chunk of the first tool
+    jobs = []
+    for folder, filenames in flake8_engine.chunks(paths, chunk_size):
+        jobs += [Job("flake8", folder, tuple(filenames)), Job("radon", folder, tuple(filenames))]
+    background = Background(jobs, concurrency, timeouts)
+
+    violations = {}
+    blocks = {}
+    for file_path in paths:
+        while file_path not in violations or file_path not in blocks:
+            result = background.get()
+            job = result.job
+            if job.tool == "flake8":
+                _check(result)
+                violations.update(flake8_engine.parse_batch_output(job.folder, job.filenames, result.stdout))
+            elif result.returncode is None:
+                error = TimedOut(f"radon {result.stderr}")
+                blocks.update((os.path.join(job.folder, filename), error) for filename in job.filenames)
+            else:
+                blocks.update(radon_engine.parse_json_output(job.folder, job.filenames, result.stdout))
+        yield file_path, violations.pop(file_path), blocks.pop(file_path)
+    background.join()
+
+
+# --- Extra tools (pylint, mypy, ruff, ...): one run per tool and variant,
+# raw output written to <variant>_<tool>.txt as each run completes ---
+def extra_tool_filename(variant, tool):
+    return f"{variant.name}_{tool}.txt"
+
+
+def start_extra_tools(variants, tools, output_dir, concurrency=None, timeouts=None):
+    jobs = []
+    names = {}
+    for variant in variants:
+        for tool in tools:
+            if tool not in TOOLS:
+                raise SystemExit(f"Unknown tool {tool!r}; expected one of {', '.join(TOOLS)}")
+            job = Job(tool, variant.folder, tuple(variant.filenames))
+            names[job] = variant
+            jobs.append(job)
+
+    def on_result(result):
+        variant = names[result.job]
+        output_file = os.path.join(output_dir, extra_tool_filename(variant, result.job.tool))
+        with open(output_file, "w", encoding="utf-8") as out:
+            out.write(result.stdout)
+        if result.returncode is None or (not result.stdout and result.stderr):
+            reason = (result.stderr.strip().splitlines() or ["no output"])[-1]
+            print(f"⚠️ {result.job.tool} on {variant.name}: {reason}")
+        else:
+            print(f"✅ {result.job.tool} on {variant.name} finished in {result.elapsed:.2f}s. "
+                  f"Check '{extra_tool_filename(variant, result.job.tool)}'")
+
+    return Background(jobs, concurrency, timeouts, on_result=on_result)
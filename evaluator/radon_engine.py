@@ -0,0 +1,188 @@
+import json
+import os
+import subprocess
+from collections import namedtuple
+
+from evaluator import timing
+
+# One radon cc block. kind is radon's letter: F (function), M (method), C (class)
+Block = namedtuple("Block", "filename kind line column endline name complexity rank")
+
+# File-level results of `radon raw`, `radon mi` and `radon hal` (totals)
+FileMetrics = namedtuple("FileMetrics", "filename loc lloc sloc comments multi blank single_comments mi mi_rank "
+                                        "h_length h_vocabulary h_volume h_difficulty h_effort h_bugs")
+
+_KINDS = {"function": "F", "method": "M", "class": "C"}
+
+
+def _rank(complexity):
+    from radon.complexity import cc_rank
+    return cc_rank(complexity)
+
+
+def format_block(block):
+    return f"    {block.kind} {block.line}:{block.column} {block.name} - {block.rank}"
+
+
+# format_file_blocks() and format_summary() reproduce `radon cc <folder> -a`.
+# A file that radon could not parse maps to its error message instead.
+def format_file_blocks(filename, blocks):
+    if isinstance(blocks, str):
+        return [filename, f"    ERROR: {blocks}"]
+    if not blocks:
+        return []
+    return [filename] + [format_block(block) for block in blocks]
+
+
+def format_summary(total, count):
+    if not count:
+        return []
+    average = total / count
+    return [f"\n{count} blocks (classes, functions, methods) analyzed.",
+            f"Average complexity: {_rank(average)} ({average})"]
+
+
+# Names unique within one file: same-named blocks (e.g. redefined helpers)
+# get a #n suffix
+def qualified_names(blocks):
+    names = []
+    seen = set()
+    for block in blocks:
+        name = block.name
+        n = 1
+        while name in seen:
+            n += 1
+            name = f"{block.name}#{n}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+# --- In-process engine: radon's visitor on each source ---
+def blocks_from_visitor(filename, visitor_blocks):
+    from radon.complexity import sorted_results
+    from radon.visitors import Function
+
+    blocks = []
+    for block in sorted_results(visitor_blocks):
+        if isinstance(block, Function):
+            kind = "M" if block.is_method else "F"
+        else:
+            kind = "C"
+        blocks.append(Block(
+            filename,
+            kind,
+            block.lineno,
+            block.col_offset,
+            block.endline,
+            block.fullname,
+            block.complexity,
+            _rank(block.complexity),
+        ))
+    return blocks
+
+
+def analyze_source(filename, source):
+    from radon.complexity import cc_visit
+
+    return blocks_from_visitor(filename, cc_visit(source))
+
+
+# Raw counts, maintainability index and Halstead totals from an already
+# parsed file. MI is put together the way radon.metrics.mi_parameters() does
+# (multi-line strings count as comments, as in `radon mi`), from the tree
+# instead of a second parse, and the total complexity of the cc visitor
+# that already walked it.
+def file_metrics(filename, source, tree, total_complexity):
+    from radon.metrics import h_visit_ast, mi_compute, mi_rank
+    from radon.raw import analyze
+
+    raw = analyze(source)
+    halstead = h_visit_ast(tree).total
+    comments = (raw.comments + raw.multi) / raw.sloc * 100 if raw.sloc else 0
+    mi = mi_compute(halstead.volume, total_complexity, raw.lloc, comments)
+    return FileMetrics(
+        filename,
+        raw.loc,
+        raw.lloc,
+        raw.sloc,
+        raw.comments,
+        raw.multi,
+        raw.blank,
+        raw.single_comments,
+        mi,
+        mi_rank(mi),
+        halstead.length,
+        halstead.vocabulary,
+        halstead.volume,
+        halstead.difficulty,
+        halstead.effort,
+        halstead.bugs,
+    )
+
+
+# --- Subprocess engine: one `radon cc -j` per folder, run from inside the
+# folder so paths come back relative ---
+def _block_from_json(filename, data):
+    name = data["name"]
+    if data.get("classname"):
+        name = f"{data['classname']}.{name}"
+    return Block(
+        filename,
+        _KINDS[data["type"]],
+        data["lineno"],
+        data["col_offset"],
+        data["endline"],
+        name,
+        data["complexity"],
+        data["rank"],
+    )
+
+
+def command(filenames):
+    return ["python", "-m", "radon", "cc", "-j", *filenames]
+
+
+# The CLI reads sources itself, as UTF-8 unless RADONFILESENCODING says
+# otherwise, so a declared encoding or a BOM can give a different result than
+# in-process; its cache entries are kept apart by these extra key parts
+def cli_cache_parts():
+    return ("cli", os.getenv("RADONFILESENCODING", "utf-8"))
+
+
+# Consecutive paths grouped by folder: (folder, [filename, ...]) ..., each
+# group yielded as soon as the next folder starts
+def group_by_folder(paths):
+    group = None
+    for file_path in paths:
+        folder, filename = os.path.split(file_path)
+        if group is not None and group[0] != folder:
+            yield group
+            group = None
+        if group is None:
+            group = (folder, [])
+        group[1].append(filename)
+    if group is not None:
+        yield group
+
+
+def parse_json_output(folder, filenames, output):
+    with timing.stage("parse output"):
+        data = json.loads(output)
+    for filename in filenames:
+        file_data = data.get(filename, [])
+        if isinstance(file_data, dict):
+            yield os.path.join(folder, filename), file_data["error"]
+        else:
+            yield os.path.join(folder, filename), [_block_from_json(filename, d) for d in file_data]
+
+
+def iter_subprocess(paths):
+    for folder, filenames in group_by_folder(paths):
+        result = subprocess.run(
+            command(filenames),
+            capture_output=True,
+            text=True,
+            cwd=folder
+        )
+        yield from parse_json_output(folder, filenames, result.stdout)
@@ -0,0 +1,124 @@
+import json
+import os
+
+from evaluator.flake8_engine import Violation
+from evaluator.radon_engine import Block
+
+
+def violation_record(variant, violation):
+    return {
+        "type": "violation",
+        "variant": variant.name,
+        "file": violation.filename,
+        "line": violation.line,
+        "column": violation.column,
+        "code": violation.code,
+        "text": violation.text,
+    }
+
+
+def file_record(variant, filename, violations):
+    return {"type": "file", "variant": variant.name, "file": filename, "violations": len(violations)}
+
+
+def block_record(variant, block):
+    return {
+        "type": "block",
+        "variant": variant.name,
+        "file": block.filename,
+        "kind": block.kind,
+        "line": block.line,
+        "column": block.column,
+        "endline": block.endline,
+        "name": block.name,
+        "complexity": block.complexity,
+        "rank": block.rank,
+    }
+
+
+# File-level radon raw/MI/Halstead metrics, or the error that stopped them
+def metrics_record(variant, filename, metrics):
+    if isinstance(metrics, str):
+        return {"type": "metrics", "variant": variant.name, "file": filename, "error": metrics}
+    (file_metrics,) = metrics
+    return {
+        "type": "metrics",
+        "variant": variant.name,
+        "file": file_metrics.filename,
+        "loc": file_metrics.loc,
+        "lloc": file_metrics.lloc,
+        "sloc": file_metrics.sloc,
+        "comments": file_metrics.comments,
+        "multi": file_metrics.multi,
+        "blank": file_metrics.blank,
+        "single_comments": file_metrics.single_comments,
+        "mi": file_metrics.mi,
+        "mi_rank": file_metrics.mi_rank,
+        "h_length": file_metrics.h_length,
+        "h_vocabulary": file_metrics.h_vocabulary,
+        "h_volume": file_metrics.h_volume,
+        "h_difficulty": file_metrics.h_difficulty,
+        "h_effort": file_metrics.h_effort,
+        "h_bugs": file_metrics.h_bugs,
+    }
+
+
+def error_record(variant, filename, message):
+    return {"type": "error", "variant": variant.name, "file": filename, "tool": "radon", "text": message}
+
+
+# Compact form of one tool's result for a file, used by the result cache and
+# the evaluation server: the leading filename field is dropped and re-attached
+# on decode, so identical content under another name still matches
+def encode_result(result):
+    if isinstance(result, str):
+        return result
+    return [list(item[1:]) for item in result]
+
+
+def result_decoder(record_type):
+    def decode(file_path, encoded):
+        if isinstance(encoded, str):
+            return encoded
+        filename = os.path.basename(file_path)
+        return [record_type(filename, *fields) for fields in encoded]
+    return decode
+
+
+# Writes one JSON object per line and flushes after every batch, so a
+# consumer tailing the file sees each file's records as soon as they land
+class JsonlWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, records):
+        for record in records:
+            self.out.write(json.dumps(record) + "\n")
+        self.out.flush()
+
+
+def load_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Inverse of the writers above: filename -> (violations, blocks) in file
+# order, with a radon error standing in for the block list as a string
+def results_from_records(records):
+    results = {}
+    for record in records:
+        kind = record["type"]
+        if kind == "file":
+            results[record["file"]] = ([], [])
+        elif kind == "violation":
+            results[record["file"]][0].append(Violation(
+                record["file"], record["line"], record["column"], record["code"], record["text"],
+            ))
+        elif kind == "block":
+            results[record["file"]][1].append(Block(
+                record["file"], record["kind"], record["line"], record["column"], record["endline"],
+                record["name"], record["complexity"], record["rank"],
+            ))
+        elif kind == "error":
+            results[record["file"]] = (results[record["file"]][0], record["text"])
+    return results
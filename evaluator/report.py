@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+
+from evaluator import flake8_engine, radon_engine, records
+
+# Report titles for the folders shipped with the dataset
+TITLES = {"original": "Original", "black": "Black", "chatgpt": "ChatGPT"}
+
+
+def report_filename(variant):
+    return f"{variant.name}_evaluation.txt"
+
+
+def records_filename(variant):
+    return f"{variant.name}_evaluation.jsonl"
+
+
+# Streams one variant's report: each file's flake8 section is written and
+# flushed as soon as its results arrive, while its radon lines go to an
+# on-disk spool that is appended as the radon section on close(). Memory
+# stays flat however large the corpus is, and a crashed run still leaves
+# every finished flake8 section (and JSONL record) on disk.
+class ReportWriter:
+    def __init__(self, variant, output_dir, jsonl=False):
+        self.variant = variant
+        self.out = open(os.path.join(output_dir, report_filename(variant)), "w", encoding="utf-8")
+        self.records = None
+        if jsonl:
+            records_file = open(os.path.join(output_dir, records_filename(variant)), "w", encoding="utf-8")
+            self.records = records.JsonlWriter(records_file)
+        self.radon_spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.total_complexity = 0
+        self.block_count = 0
+
+        title = TITLES.get(variant.name, variant.name.capitalize())
+        self.out.write(f"===== {title} File Evaluation Report =====\n\n")
+
+        # --- FLAKE8 Evaluation ---
+        self.out.write("FLAKE8 Style Violations\n\n")
+
+    # radon_metrics ([FileMetrics] or an error) only goes to the JSONL records
+    def add(self, filename, violations, blocks, radon_metrics=None):
+        self.out.write(f"File: {filename}\n")
+        output = flake8_engine.format_violations(violations) or "No violations found."
+        self.out.write(output + "\n\n")
+        self.out.flush()
+
+        for line in radon_engine.format_file_blocks(filename, blocks):
+            self.radon_spool.write(line + "\n")
+        if not isinstance(blocks, str):
+            self.total_complexity += sum(block.complexity for block in blocks)
+            self.block_count += len(blocks)
+
+        if self.records is not None:
+            self.write_records(filename, violations, blocks, radon_metrics)
+
+    def write_records(self, filename, violations, blocks, radon_metrics=None):
+        variant = self.variant
+        batch = [records.file_record(variant, filename, violations)]
+        batch.extend(records.violation_record(variant, violation) for violation in violations)
+        if isinstance(blocks, str):
+            batch.append(records.error_record(variant, filename, blocks))
+        else:
+            batch.extend(records.block_record(variant, block) for block in blocks)
+        if radon_metrics is not None:
+            batch.append(records.metrics_record(variant, filename, radon_metrics))
+        self.records.write(batch)
+
+    def close(self, profile_lines=None):
+        # --- RADON Complexity Evaluation ---
+        self.out.write("\nRadon Cyclomatic Complexity\n\n")
+        self.radon_spool.seek(0)
+        shutil.copyfileobj(self.radon_spool, self.out)
+        for line in radon_engine.format_summary(self.total_complexity, self.block_count):
+            self.out.write(line + "\n")
+
+        # --- Profile (--profile only) ---
+        if profile_lines:
+            self.out.write("\nProfile\n\n")
+            for line in profile_lines:
+                self.out.write(line + "\n")
+
+        self.radon_spool.close()
+        self.out.close()
+        if self.records is not None:
+            self.records.out.close()
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+
+from evaluator import radon_engine
+from evaluator.cache import DEFAULT_CACHE_DIR, ResultCache
+from evaluator.client import DEFAULT_SOCKET
+from evaluator.corpus import file_signature
+from evaluator.evaluate import iter_results
+from evaluator.flake8_engine import Linter
+from evaluator.records import encode_result
+
+# Engines that run inside the server process and so benefit from staying warm
+SERVER_ENGINES = ("shared", "inprocess")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            if request.get("command") == "stats":
+                self._send({"type": "stats", **self.server.stats()})
+            elif request.get("command") == "shutdown":
+                # shutdown() waits for serve_forever() to return, which is this thread
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                for file_path, violations, blocks in self.server.evaluate(request["paths"]):
+                    if not self._send({"type": "result", "path": file_path, "violations": encode_result(violations),
+                                       "blocks": encode_result(blocks)}):
+                        return
+        except Exception as e:
+            self._send({"type": "error", "text": f"{type(e).__name__}: {e}"})
+            return
+        self._send({"type": "done"})
+
+    # False once the client has hung up; there is nobody left to answer then
+    def _send(self, message):
+        try:
+            self.wfile.write((json.dumps(message) + "\n").encode())
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+        return True
+
+
+# Keeps one flake8 application, radon and the result cache loaded between
+# requests. Requests are served one at a time, since the Linter is not
+# thread-safe; results are also memoized in memory by file mtime and size,
+# so an unchanged file costs one stat().
+class EvaluationServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path=DEFAULT_SOCKET, engine="shared", cache_dir=DEFAULT_CACHE_DIR):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, _Handler)
+        self.socket_path = socket_path
+        self.engine = engine
+        self.cache = ResultCache(cache_dir) if cache_dir else None
+        self.linter = Linter()
+        radon_engine.analyze_source("warmup.py", "def warmup():\n    pass\n")
+        self.results = {}
+        self.requests = 0
+        self.files = 0
+        self.evaluated = 0
+        self.started = time.time()
+
+    def evaluate(self, paths):
+        self.requests += 1
+        writes = self.cache.writes if self.cache is not None else 0
+        paths = [os.path.abspath(file_path) for file_path in paths]
+        signatures = {file_path: file_signature(file_path) for file_path in paths}
+        stale = [file_path for file_path in paths
+                 if file_path not in self.results or self.results[file_path][0] != signatures[file_path]]
+        fresh = iter_results(stale, self.engine, cache=self.cache, linter=self.linter)
+        for file_path in paths:
+            if self.results.get(file_path, (None,))[0] != signatures[file_path]:
+                _, violations, blocks = next(fresh)
+                self.results[file_path] = (signatures[file_path], violations, blocks)
+                self.evaluated += 1
+            self.files += 1
+            _, violations, blocks = self.results[file_path]
+            yield file_path, violations, blocks
+        # Walking the whole cache directory costs far more than a memoized
+        # request, so it is only done after requests that added entries
+        if self.cache is not None and self.cache.writes > writes:
+            self.cache.evict()
+
+    def stats(self):
+        return {
+            "engine": self.engine,
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "files": self.files,
+            "evaluated": self.evaluated,
+            "memoized": len(self.results),
+            "cache": self.cache.summary() if self.cache is not None else "disabled",
+        }
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m evaluator.server",
+                                     description="Long-running evaluation server with flake8 and radon kept warm")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--engine", choices=SERVER_ENGINES, default="shared",
+                        help="shared: one parse per file for flake8 and radon; inprocess: separate passes")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"result cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="only keep results in memory")
+    args = parser.parse_args()
+
+    server = EvaluationServer(args.socket, args.engine, None if args.no_cache else args.cache_dir)
+    print(f"✅ Evaluation server listening on '{args.socket}' (engine: {args.engine})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# Files whose own time is listed at the end of the profile
+SLOWEST_FILES = 5
+
+# The profiler for the current run, or None when profiling is off so every
+# stage() below is a no-op
+_active = None
+
+
+class Profiler:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stages = defaultdict(lambda: [0.0, 0.0, 0])
+        self.files = defaultdict(lambda: defaultdict(lambda: [0.0, 0.0, 0]))
+        self.events = []
+        self._local = threading.local()
+
+    # Wall time (perf_counter) and CPU time (thread_time) of one stage. Time
+    # spent in a nested stage is only counted there, so the stage totals add
+    # up to the run. `info["file"]` may be set inside the block when the file
+    # is only known once the work is done.
+    @contextmanager
+    def stage(self, name, file=None):
+        frames = self._local.__dict__.setdefault("frames", [])
+        frame = [0.0, 0.0]
+        info = {"file": file}
+        frames.append(frame)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield info
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            frames.pop()
+            if frames:
+                frames[-1][0] += wall
+                frames[-1][1] += cpu
+            if not info.get("skip"):
+                self._record(name, info["file"], wall_start, wall, wall - frame[0], cpu - frame[1])
+
+    def _record(self, name, file, start, wall, own_wall, own_cpu):
+        totals = self.stages[name]
+        totals[0] += own_wall
+        totals[1] += own_cpu
+        totals[2] += 1
+        if file:
+            file_totals = self.files[file][name]
+            file_totals[0] += own_wall
+            file_totals[1] += own_cpu
+            file_totals[2] += 1
+        args = {"cpu_ms": round(own_cpu * 1000, 3)}
+        if file:
+            args["file"] = file
+        self.events.append({
+            "name": name,
+            "cat": "evaluator",
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 1),
+            "dur": round(wall * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    # Stage totals and slowest files, restricted to `files` when given
+    def summary_lines(self, files=None):
+        if files is None:
+            stages = self.stages
+            file_times = self.files
+        else:
+            file_times = {file: self.files[file] for file in files if file in self.files}
+            stages = defaultdict(lambda: [0.0, 0.0, 0])
+            for times in file_times.values():
+                for name, file_totals in times.items():
+                    stages[name] = [total + value for total, value in zip(stages[name], file_totals)]
+
+        lines = [f"{'Stage':<16} {'wall s':>9} {'cpu s':>9} {'calls':>7}"]
+        for name, (wall, cpu, count) in sorted(stages.items(), key=lambda item: -item[1][0]):
+            lines.append(f"{name:<16} {wall:>9.3f} {cpu:>9.3f} {count:>7}")
+        lines.append(f"{'total':<16} {sum(s[0] for s in stages.values()):>9.3f} "
+                     f"{sum(s[1] for s in stages.values()):>9.3f}")
+
+        def file_wall(item):
+            return sum(totals[0] for totals in item[1].values())
+
+        slowest = sorted(file_times.items(), key=file_wall, reverse=True)[:SLOWEST_FILES]
+        if slowest:
+            lines.append("")
+            lines.append("Slowest files")
+            for file, times in slowest:
+                ranked = sorted(times.items(), key=lambda item: -item[1][0])
+                breakdown = ", ".join(f"{name} {totals[0]:.3f}s" for name, totals in ranked
+                                      if round(totals[0], 3) or name == ranked[0][0])
+                label = os.path.join(os.path.basename(os.path.dirname(file)), os.path.basename(file))
+                lines.append(f"    {label} {file_wall((file, times)):.3f}s ({breakdown})")
+        return lines
+
+    # Chrome trace event format, loadable in chrome://tracing or Perfetto
+    def write_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+def enable():
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def stage(name, file=None):
+    if _active is None:
+        return nullcontext({})
+    return _active.stage(name, file)
+
+
+# Times each step of a (path, ...) iterator as `name` against the path it
+# yields; lazy engines do their work inside next(), so this is the tool's time.
+# Engines that run a whole folder or chunk at once charge it to its first file.
+def timed_iter(name, iterator):
+    if _active is None:
+        return iterator
+    return _timed(_active, name, iter(iterator))
+
+
+def _timed(profiler, name, iterator):
+    while True:
+        with profiler.stage(name) as info:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                info["skip"] = True
+                return
+            info["file"] = item[0]
+        yield item
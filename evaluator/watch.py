@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import time
+
+from evaluator import report
+from evaluator.cache import ResultCache
+from evaluator.corpus import file_signature, load_variants, variant_paths
+from evaluator.evaluate import iter_results
+from evaluator.flake8_engine import Linter
+
+DEFAULT_INTERVAL = 0.2
+
+
+# Every sample file of every folder -> its signature, re-listing the folders
+# so added and deleted files are noticed too
+def scan(folders):
+    variants = load_variants(folders)
+    signatures = {}
+    for variant in variants:
+        for file_path in variant_paths(variant):
+            try:
+                signatures[file_path] = file_signature(file_path)
+            except FileNotFoundError:
+                pass
+    return variants, signatures
+
+
+# Rewrites one variant's report (and JSONL records) from `results`. Both are
+# built next to the originals and swapped in with os.replace(), so a reader
+# never sees a half-written report.
+def write_reports(variant, results, output_dir, jsonl=False):
+    staging = tempfile.mkdtemp(prefix=".watch-", dir=output_dir)
+    try:
+        writer = report.ReportWriter(variant, staging, jsonl=jsonl)
+        try:
+            for file_path in variant_paths(variant):
+                if file_path in results:
+                    violations, blocks = results[file_path]
+                    writer.add(os.path.basename(file_path), violations, blocks)
+        finally:
+            writer.close()
+        filenames = [report.report_filename(variant)]
+        if jsonl:
+            filenames.append(report.records_filename(variant))
+        for filename in filenames:
+            os.replace(os.path.join(staging, filename), os.path.join(output_dir, filename))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _label(file_path):
+    return os.path.join(os.path.basename(os.path.dirname(file_path)), os.path.basename(file_path))
+
+
+# Polls the folders every `interval` seconds and re-evaluates only the files
+# whose mtime or size changed, with one warm flake8 kept for the whole
+# session; then rewrites the reports of the variants they belong to
+def watch(folders, engine="shared", interval=DEFAULT_INTERVAL, output_dir=None, cache_dir=None, jsonl=False):
+    output_dir = output_dir or os.getcwd()
+    cache = ResultCache(cache_dir) if cache_dir else None
+    linter = Linter() if engine in ("inprocess", "shared") else None
+    signatures = {}
+    results = {}
+
+    print(f"Watching {', '.join(folders)} every {interval}s (Ctrl+C to stop)", flush=True)
+    try:
+        while True:
+            started = time.perf_counter()
+            variants, current = scan(folders)
+            changed = [file_path for file_path in current if signatures.get(file_path) != current[file_path]]
+            removed = [file_path for file_path in signatures if file_path not in current]
+            if changed or removed:
+                # A file deleted since scan() counts as removed for this tick
+                unreadable = []
+                for file_path, violations, blocks in iter_results(changed, engine, cache=cache, linter=linter,
+                                                                  on_unreadable=unreadable.append):
+                    results[file_path] = (violations, blocks)
+                for file_path in unreadable:
+                    del current[file_path]
+                for file_path in removed + unreadable:
+                    results.pop(file_path, None)
+
+                touched = {os.path.dirname(file_path) for file_path in changed + removed}
+                for variant in variants:
+                    if variant.folder in touched:
+                        write_reports(variant, results, output_dir, jsonl)
+                        print(f"✅ Updated '{report.report_filename(variant)}'", flush=True)
+                if signatures:
+                    names = ", ".join(_label(file_path) for file_path in changed + removed)
+                    print(f"    {names} in {time.perf_counter() - started:.3f}s", flush=True)
+                signatures = current
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.evict()